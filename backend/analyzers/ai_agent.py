@@ -6,7 +6,198 @@ AI Agent 增强模块（可选）
 """
 
 import os
-from typing import Dict, Optional
+import re
+import json
+import time
+import hashlib
+import functools
+import random
+import threading
+import importlib.util
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 可选：orjson 序列化更快（缓存键、批处理 JSONL），未安装时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 各 provider 的默认模型，以及简单问题使用的轻量模型
+_DEFAULT_MODELS = {
+    'openai': 'gpt-4',
+    'anthropic': 'claude-3-5-sonnet-20241022',
+}
+_LIGHT_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'anthropic': 'claude-3-5-haiku-20241022',
+}
+
+# 假设场景 -> 能直接证实该场景的发现类别；只有这类发现支撑的唯一高优先级
+# 假设才算规则已经确诊（见 _needs_llm）
+_SCENARIO_FINDING_CATEGORIES = {
+    'Kernel Null Pointer Dereference': frozenset({'null_pointer'}),
+    'Page Table Misconfiguration': frozenset({'security_violation', 'code_writable', 'wx_violation'}),
+    'Write to Read-Only Page (Possible COW)': frozenset({'write_to_readonly'}),
+    'General Protection Fault / Invalid Operation': frozenset({'general_protection'}),
+}
+
+# 调试输出短于该长度（字符）且最多一个假设时使用轻量模型
+_LIGHT_MODEL_MAX_OUTPUT = 500
+
+# 静态系统提示：放在请求最前面，便于 provider 端的前缀缓存
+# （OpenAI 自动缓存相同前缀，Anthropic 通过 cache_control 显式缓存）
+_SYSTEM_PROMPT = "你是一个操作系统调试专家助教。"
+
+_ANALYSIS_SYSTEM_PROMPT = """你是一个操作系统调试专家助教。学生遇到了内核崩溃，需要你的帮助。
+
+用户会提供调试输出和自动分析结果。请提供：
+1. **根本原因解释**（用学生能理解的语言）
+2. **具体的代码修复建议**（如果可能，给出代码示例）
+3. **调试步骤**（下一步应该做什么）
+4. **学习要点**（这个 bug 教会了我们什么）
+
+保持简洁、实用、教育性。"""
+
+# 可重试的 HTTP 状态码（限流 / 服务端错误）
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(error: Exception) -> bool:
+    """判断 API 异常是否值得重试"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    # 网络层错误（连接失败、超时）没有状态码
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+_MODEL_DATE_SUFFIX_RE = re.compile(r'-\d{8}$')
+
+# 调试输出压缩用到的正则
+_KERNEL_TIMESTAMP_RE = re.compile(r'^\[\s*\d+\.\d+\]\s*')
+_HSPACE_RE = re.compile(r'[ \t]+')
+_FRAME_NUM_RE = re.compile(r'^#\d+\s+')
+
+
+def _dumps(obj, sort_keys: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON 字节串"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False).encode('utf-8')
+
+
+def _model_label(model: str) -> str:
+    """用于展示的模型名（去掉日期后缀，如 claude-3-5-sonnet-20241022 -> claude-3-5-sonnet）"""
+    return _MODEL_DATE_SUFFIX_RE.sub('', model)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """
+    加载 tiktoken 编码器（只加载一次）
+
+    tiktoken 为可选依赖；未安装或无法加载编码表（如离线环境）时返回 None，
+    此时按字符类别估算 token 数。
+    """
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model('gpt-4')
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _estimate_tokens(text: str) -> int:
+    """
+    计算 token 数
+
+    优先使用 tiktoken 精确计数；否则粗略估算：
+    ASCII 约 4 字符 / token，CJK 等非 ASCII 字符约 1 字符 / token。
+    """
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """把文本截断到最多 max_tokens 个 token"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+
+    budget = max_tokens * 4
+    for i, ch in enumerate(text):
+        budget -= 4 if ord(ch) > 127 else 1
+        if budget < 0:
+            return text[:i]
+    return text
+
+
+def _build_http_clients():
+    """
+    创建带连接池的 httpx 客户端（同步 + 异步）
+
+    保持长连接，重复请求同一 API 时省去 TCP/TLS 握手。
+    httpx 是 openai / anthropic SDK 的依赖，无需额外安装。
+    """
+    import httpx
+
+    limits = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+    timeout = httpx.Timeout(connect=10.0, read=60.0, write=30.0, pool=5.0)
+    return (
+        httpx.Client(limits=limits, timeout=timeout),
+        httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+
+
+class _RateLimiter:
+    """
+    异步调用的并发与速率限制
+
+    参考 openai-cookbook 的 api_request_parallel_processor：
+    并发数由信号量控制，每分钟的请求数 / token 数按时间线性补充，
+    发送请求前先扣除预算，预算不足时等待。
+    """
+
+    def __init__(self, max_concurrent: int, max_requests_per_minute: int,
+                 max_tokens_per_minute: int):
+        self.loop = asyncio.get_running_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_requests = float(max_requests_per_minute)
+        self.available_tokens = float(max_tokens_per_minute)
+        self._last_update = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_requests = min(
+            self.max_requests_per_minute,
+            self.available_requests + self.max_requests_per_minute * elapsed / 60.0
+        )
+        self.available_tokens = min(
+            self.max_tokens_per_minute,
+            self.available_tokens + self.max_tokens_per_minute * elapsed / 60.0
+        )
+
+    async def acquire(self, tokens: int):
+        """等待直到预算足够，然后扣除（检查与扣除之间没有 await，因此是原子的）"""
+        tokens = min(tokens, self.max_tokens_per_minute)
+        while True:
+            self._refill()
+            if self.available_requests >= 1 and self.available_tokens >= tokens:
+                self.available_requests -= 1
+                self.available_tokens -= tokens
+                return
+            await asyncio.sleep(0.1)
 
 
 class AIDebugAgent:
@@ -19,16 +210,42 @@ class AIDebugAgent:
     3. 与学生的对话式交互
     """
 
-    def __init__(self, api_key: Optional[str] = None, provider: str = 'openai'):
+    def __init__(self, api_key: Optional[str] = None, provider: str = 'openai',
+                 max_concurrent: int = 10, max_requests_per_minute: int = 500,
+                 max_tokens_per_minute: int = 80000, max_attempts: int = 5,
+                 cache_size: int = 512, use_batch_api: bool = False):
         """
         初始化 AI agent
 
         Args:
             api_key: API 密钥（可选，从环境变量读取）
             provider: 'openai', 'anthropic', 或 'local'
+            max_concurrent: 异步调用的最大并发数
+            max_requests_per_minute: 异步调用每分钟请求数上限
+            max_tokens_per_minute: 异步调用每分钟 token 数上限
+            max_attempts: 遇到限流 (429) 或服务端错误 (5xx) 时的最大尝试次数
+            cache_size: 响应缓存的最大条目数（0 表示不缓存）
+            use_batch_api: enhance_analysis_batch 是否通过 Batch API 提交（费用减半，但非实时）
         """
         self.enabled = False
         self.provider = provider
+        self.client = None
+        self.async_client = None
+        self._client_lock = threading.Lock()
+        self.max_concurrent = max_concurrent
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.max_attempts = max_attempts
+        self.use_batch_api = use_batch_api
+        self._limiter: Optional[_RateLimiter] = None
+
+        # 响应缓存：相同的请求参数（模型 + 提示）直接返回上次的结果
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        # 全局实例被多个请求线程共用，查询/写入缓存时需加锁
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.api_key = api_key or os.environ.get('OPENAI_API_KEY') or os.environ.get('ANTHROPIC_API_KEY')
 
         if self.api_key:
@@ -36,32 +253,58 @@ class AIDebugAgent:
             self._init_client()
 
     def _init_client(self):
-        """初始化 LLM 客户端"""
+        """
+        检查 LLM SDK 是否已安装
+
+        SDK 体积较大（openai + httpx + pydantic），这里只检查可用性，
+        真正的导入和客户端创建推迟到第一次调用（见 _ensure_client），
+        不使用 AI 功能时不影响后端启动速度和内存。
+        """
         if self.provider == 'openai':
-            try:
-                import openai
-                self.client = openai.OpenAI(api_key=self.api_key)
-                print("✓ OpenAI AI Agent 已启用")
-            except ImportError:
+            if importlib.util.find_spec('openai') is None:
                 print("⚠ 需要安装 openai: pip install openai")
                 self.enabled = False
+            else:
+                print("✓ OpenAI AI Agent 已启用")
 
         elif self.provider == 'anthropic':
-            try:
-                import anthropic
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-                print("✓ Claude AI Agent 已启用")
-            except ImportError:
+            if importlib.util.find_spec('anthropic') is None:
                 print("⚠ 需要安装 anthropic: pip install anthropic")
                 self.enabled = False
+            else:
+                print("✓ Claude AI Agent 已启用")
+
+    def _ensure_client(self):
+        """第一次调用时导入 SDK 并创建客户端（多线程安全）"""
+        if self.client is not None and self.async_client is not None:
+            return
+
+        with self._client_lock:
+            if self.client is not None and self.async_client is not None:
+                return
+
+            if self.provider == 'openai':
+                import openai
+                sync_http, async_http = _build_http_clients()
+                self.async_client = openai.AsyncOpenAI(api_key=self.api_key, http_client=async_http)
+                self.client = openai.OpenAI(api_key=self.api_key, http_client=sync_http)
+
+            elif self.provider == 'anthropic':
+                import anthropic
+                sync_http, async_http = _build_http_clients()
+                self.async_client = anthropic.AsyncAnthropic(api_key=self.api_key, http_client=async_http)
+                self.client = anthropic.Anthropic(api_key=self.api_key, http_client=sync_http)
 
-    def enhance_analysis(self, basic_analysis: Dict, debug_output: str) -> Dict:
+    def enhance_analysis(self, basic_analysis: Dict, debug_output: str,
+                         in_place: bool = False) -> Dict:
         """
         使用 AI 增强基础分析
 
         Args:
             basic_analysis: 基于规则的分析结果
             debug_output: 原始调试输出
+            in_place: 为 True 时直接修改 basic_analysis 并返回它（返回值与输入是同一个对象），
+                      省去一次字典复制；默认返回新的字典
 
         Returns:
             增强后的分析结果
@@ -69,101 +312,569 @@ class AIDebugAgent:
         if not self.enabled:
             return basic_analysis
 
+        if not self._needs_llm(basic_analysis):
+            return self._mark_skipped(basic_analysis, in_place)
+
         try:
             # 构建提示
-            prompt = self._build_prompt(basic_analysis, debug_output)
+            budget = self._estimate_budget(basic_analysis)
+            prompt = self._build_prompt(basic_analysis, debug_output, budget)
 
             # 调用 LLM
-            ai_insights = self._call_llm(prompt)
+            model = self._select_model(basic_analysis, debug_output)
+            ai_insights = self._call_llm(prompt, max_tokens=budget, model=model,
+                                         system=_ANALYSIS_SYSTEM_PROMPT, deterministic=True)
 
             # 合并结果
-            enhanced = basic_analysis.copy()
-            enhanced['ai_insights'] = ai_insights
-            enhanced['ai_enabled'] = True
+            return self._merge_insights(basic_analysis, ai_insights, in_place)
 
-            return enhanced
+        except Exception as e:
+            print(f"AI 增强失败: {e}")
+            return basic_analysis
 
+    def enhance_analysis_stream(self, basic_analysis: Dict, debug_output: str) -> Iterator[str]:
+        """
+        流式生成 AI 见解
+
+        逐段产出模型生成的文本，前端可以边生成边显示，
+        感知延迟从完整生成时间降到首个 token 的时间。
+        """
+        if not self.enabled or not self._needs_llm(basic_analysis):
+            return
+
+        try:
+            budget = self._estimate_budget(basic_analysis)
+            prompt = self._build_prompt(basic_analysis, debug_output, budget)
+            model = self._select_model(basic_analysis, debug_output)
+            yield from self._call_llm(prompt, max_tokens=budget, stream=True, model=model,
+                                      system=_ANALYSIS_SYSTEM_PROMPT, deterministic=True)
         except Exception as e:
             print(f"AI 增强失败: {e}")
+
+    async def aenhance_analysis(self, basic_analysis: Dict, debug_output: str,
+                                in_place: bool = False) -> Dict:
+        """
+        enhance_analysis 的异步版本（in_place 含义相同）
+
+        不阻塞事件循环，多个会话的分析可以同时等待 LLM 响应。
+        """
+        if not self.enabled:
             return basic_analysis
 
-    def _build_prompt(self, analysis: Dict, debug_output: str) -> str:
-        """构建 LLM 提示"""
+        if not self._needs_llm(basic_analysis):
+            return self._mark_skipped(basic_analysis, in_place)
 
-        # 提取关键信息
+        try:
+            budget = self._estimate_budget(basic_analysis)
+            prompt = self._build_prompt(basic_analysis, debug_output, budget)
+            model = self._select_model(basic_analysis, debug_output)
+            ai_insights = await self._call_llm_async(prompt, max_tokens=budget, model=model,
+                                                     system=_ANALYSIS_SYSTEM_PROMPT,
+                                                     deterministic=True)
+
+            return self._merge_insights(basic_analysis, ai_insights, in_place)
+
+        except Exception as e:
+            print(f"AI 增强失败: {e}")
+            return basic_analysis
+
+    async def aenhance_analysis_many(self, items: List[Tuple[Dict, str]]) -> List[Dict]:
+        """
+        并发增强多个分析结果
+
+        Args:
+            items: (basic_analysis, debug_output) 列表
+
+        Returns:
+            与输入顺序一致的增强结果列表
+        """
+        return await asyncio.gather(
+            *(self.aenhance_analysis(analysis, output) for analysis, output in items)
+        )
+
+    def _needs_llm(self, analysis: Dict) -> bool:
+        """
+        判断是否需要调用 LLM
+
+        规则分析只给出一个高优先级假设、并且有该场景特有类别的发现直接支撑时
+        （如空指针假设配上 null_pointer 发现），属于已知的典型模式，
+        规则结果本身已经足够，跳过这次 LLM 调用。只有泛泛的发现（如 panic）
+        时仍交给 LLM，由 _select_model 按输出规模选模型。
+        """
         hypotheses = analysis.get('hypotheses', [])
-        findings = analysis.get('all_findings', [])
+        if len(hypotheses) != 1 or hypotheses[0].get('priority') != 'high':
+            return True
+        categories = _SCENARIO_FINDING_CATEGORIES.get(hypotheses[0].get('scenario'))
+        if not categories:
+            return True
+        return not any(finding.get('category') in categories
+                       for finding in analysis.get('all_findings', []))
+
+    def _mark_skipped(self, analysis: Dict, in_place: bool = False) -> Dict:
+        """标记本次分析跳过了 AI 增强"""
+        result = analysis if in_place else analysis.copy()
+        result['ai_enabled'] = False
+        result['ai_skipped_reason'] = 'high_confidence_rule_match'
+        return result
+
+    def _estimate_budget(self, analysis: Dict) -> int:
+        """
+        根据分析结果的复杂度估算输出 token 预算
 
-        prompt = f"""你是一个操作系统调试专家。学生遇到了内核崩溃，需要你的帮助。
+        简单的单一发现不需要 1000 tokens 的回答；
+        假设和发现越多，预算越大，上限 1200。
+        """
+        num_hypotheses = len(analysis.get('hypotheses', []))
+        num_findings = len(analysis.get('all_findings', []))
+        return min(1200, 200 + 120 * num_hypotheses + 80 * num_findings)
 
-## 调试输出
-```
-{debug_output[:2000]}  # 限制长度
-```
+    def _estimate_chat_budget(self, message: str) -> int:
+        """根据问题长度估算对话回答的输出 token 预算"""
+        return min(1200, 300 + 2 * _estimate_tokens(message))
 
-## 自动分析结果
-"""
+    def enhance_analysis_batch(self, items: List[Tuple[Dict, str]],
+                               poll_interval: float = 30.0) -> List[Dict]:
+        """
+        批量增强多个分析结果（适合整班作业的离线批改等非交互场景）
+
+        use_batch_api 为 True 时通过 OpenAI Batch API / Anthropic Message Batches API
+        一次提交所有请求并轮询等待结果；否则逐个调用 enhance_analysis。
+
+        Args:
+            items: (basic_analysis, debug_output) 列表
+            poll_interval: 轮询批处理状态的间隔（秒）
+
+        Returns:
+            与输入顺序一致的增强结果列表（失败的条目返回原始分析结果）
+        """
+        if not self.enabled:
+            return [analysis for analysis, _ in items]
+
+        if not self.use_batch_api or self.provider not in ('openai', 'anthropic'):
+            return [self.enhance_analysis(analysis, output) for analysis, output in items]
+
+        # 构建请求，已缓存的条目不再提交
+        pending = {}
+        insights: Dict[str, Dict] = {}
+        for i, (analysis, output) in enumerate(items):
+            if not self._needs_llm(analysis):
+                continue
+            budget = self._estimate_budget(analysis)
+            params = self._request_params(self._build_prompt(analysis, output, budget), budget,
+                                          self._select_model(analysis, output),
+                                          _ANALYSIS_SYSTEM_PROMPT, deterministic=True)
+            cached = self._cache_get(self._cache_key(params))
+            if cached is not None:
+                insights[str(i)] = cached
+            else:
+                pending[str(i)] = params
+
+        if pending:
+            try:
+                self._ensure_client()
+                if self.provider == 'openai':
+                    batch_insights = self._run_openai_batch(pending, poll_interval)
+                else:
+                    batch_insights = self._run_anthropic_batch(pending, poll_interval)
+            except Exception as e:
+                print(f"AI 批量增强失败: {e}")
+                batch_insights = {}
+
+            for custom_id, result in batch_insights.items():
+                self._cache_put(self._cache_key(pending[custom_id]), result)
+                insights[custom_id] = result
+
+        results = []
+        for i, (analysis, _) in enumerate(items):
+            if not self._needs_llm(analysis):
+                results.append(self._mark_skipped(analysis))
+                continue
+
+            ai_insights = insights.get(str(i))
+            if not ai_insights:
+                results.append(analysis)
+                continue
+
+            results.append(self._merge_insights(analysis, ai_insights))
+
+        return results
+
+    def _run_openai_batch(self, requests: Dict[str, Dict], poll_interval: float) -> Dict[str, Dict]:
+        """通过 OpenAI Batch API 提交请求，返回 custom_id -> 结果"""
+        jsonl = b'\n'.join(
+            _dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': params
+            })
+            for custom_id, params in requests.items()
+        )
+
+        batch_file = self.client.files.create(
+            file=('enhance_batch.jsonl', jsonl),
+            purpose='batch'
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != 'completed' or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} 未完成: {batch.status}")
+
+        results = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get('response') or {}
+            if response.get('status_code') != 200:
+                continue
+            custom_id = record['custom_id']
+            results[custom_id] = {
+                'explanation': response['body']['choices'][0]['message']['content'],
+                'model': _model_label(requests[custom_id]['model']),
+                'provider': 'openai'
+            }
+
+        return results
+
+    def _run_anthropic_batch(self, requests: Dict[str, Dict], poll_interval: float) -> Dict[str, Dict]:
+        """通过 Anthropic Message Batches API 提交请求，返回 custom_id -> 结果"""
+        batch = self.client.messages.batches.create(
+            requests=[
+                {'custom_id': custom_id, 'params': params}
+                for custom_id, params in requests.items()
+            ]
+        )
+
+        while batch.processing_status != 'ended':
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        results = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == 'succeeded':
+                results[entry.custom_id] = self._parse_response(
+                    entry.result.message, requests[entry.custom_id]['model'])
+
+        return results
+
+    def _merge_insights(self, analysis: Dict, ai_insights: Dict, in_place: bool = False) -> Dict:
+        """把 AI 见解合并进分析结果"""
+        enhanced = analysis if in_place else analysis.copy()
+        enhanced['ai_insights'] = ai_insights
+        enhanced['ai_enabled'] = True
+        return enhanced
+
+    def _build_prompt(self, analysis: Dict, debug_output: str, budget: Optional[int] = None) -> str:
+        """
+        构建 LLM 提示中随请求变化的部分
+
+        固定的角色设定和回答要求在 _ANALYSIS_SYSTEM_PROMPT 中。
+        """
+
+        # 提取关键信息
+        hypotheses = analysis.get('hypotheses', [])
+        findings = analysis.get('all_findings', [])
+
+        parts = [
+            "## 调试输出",
+            "```",
+            self._compress_debug_output(debug_output, 1500),
+            "```",
+            "",
+            "## 自动分析结果",
+        ]
 
         if hypotheses:
-            prompt += "\n### 检测到的假设：\n"
+            parts.append("\n### 检测到的假设：")
             for i, hyp in enumerate(hypotheses[:3], 1):
-                prompt += f"{i}. {hyp['scenario']} (优先级: {hyp['priority']})\n"
+                parts.append(f"{i}. {hyp['scenario']} (优先级: {hyp['priority']})")
 
         if findings:
-            prompt += "\n### 关键发现：\n"
+            parts.append("\n### 关键发现：")
             for finding in findings[:5]:
-                prompt += f"- [{finding['severity']}] {finding['category']}\n"
+                parts.append(f"- [{finding['severity']}] {finding['category']}")
 
-        prompt += """
+        if budget:
+            parts.append(f"\n请在 {budget} tokens 内作答。")
 
-请提供：
-1. **根本原因解释**（用学生能理解的语言）
-2. **具体的代码修复建议**（如果可能，给出代码示例）
-3. **调试步骤**（下一步应该做什么）
-4. **学习要点**（这个 bug 教会了我们什么）
+        return '\n'.join(parts) + '\n'
 
-保持简洁、实用、教育性。
-"""
+    def _compress_debug_output(self, text: str, max_tokens: int) -> str:
+        """
+        压缩调试输出以节省输入 token
 
-        return prompt
+        1. 去掉内核日志时间戳 ``[ 12.345678]``，合并行内多余空白，删除空行
+        2. 连续重复的行（如递归导致的相同栈帧，忽略帧号）只保留一行并注明重复次数
+        3. 按 token 预算截断（按行截断，避免截断在行中间）
+        """
+        lines = []
+        prev_key = None
+        repeat = 0
+
+        for raw_line in text.splitlines():
+            line = _HSPACE_RE.sub(' ', _KERNEL_TIMESTAMP_RE.sub('', raw_line.strip()))
+            if not line:
+                continue
+
+            key = _FRAME_NUM_RE.sub('', line)
+            if key == prev_key:
+                repeat += 1
+                continue
+
+            if repeat:
+                lines.append(f"... (上一行重复 {repeat} 次)")
+            lines.append(line)
+            prev_key = key
+            repeat = 0
+
+        if repeat:
+            lines.append(f"... (上一行重复 {repeat} 次)")
+
+        kept = []
+        used = 0
+        for line in lines:
+            cost = _estimate_tokens(line) + 1
+            if used + cost > max_tokens:
+                if not kept:
+                    # 第一行就超出预算：截断这一行
+                    kept.append(_truncate_tokens(line, max_tokens))
+                kept.append("... (已截断)")
+                break
+            kept.append(line)
+            used += cost
+
+        return '\n'.join(kept)
+
+    def _select_model(self, analysis: Dict, debug_output: str) -> str:
+        """
+        根据问题复杂度选择模型
 
-    def _call_llm(self, prompt: str) -> Dict:
-        """调用 LLM API"""
+        确诊的情况已被 _needs_llm 跳过；剩下的分析中，最多一个假设、且调试
+        输出很短的，LLM 只需要解释和润色，交给轻量模型即可；
+        假设更多或输出更长时使用默认模型。
+        """
+        if (len(analysis.get('hypotheses', [])) <= 1
+                and len(debug_output) < _LIGHT_MODEL_MAX_OUTPUT):
+            return _LIGHT_MODELS.get(self.provider, _DEFAULT_MODELS.get(self.provider, ''))
+        return _DEFAULT_MODELS.get(self.provider, '')
+
+    def _request_params(self, prompt: str, max_tokens: int = 1000,
+                        model: Optional[str] = None, system: str = _SYSTEM_PROMPT,
+                        deterministic: bool = False) -> Dict:
+        """
+        构建 LLM 请求参数（同步与异步调用共用）
+
+        deterministic 为 True（崩溃分析）时使用 temperature 0，结果确定，
+        可以缓存；对话保持原来的采样温度，不缓存（见 _cache_key）。
+        """
+        model = model or _DEFAULT_MODELS.get(self.provider, '')
 
         if self.provider == 'openai':
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "你是一个操作系统调试专家助教。"},
+            return {
+                'model': model,
+                'messages': [
+                    {"role": "system", "content": system},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=1000,
-                temperature=0.7
-            )
+                'max_tokens': max_tokens,
+                'temperature': 0 if deterministic else 0.7
+            }
 
+        params = {
+            'model': model,
+            'max_tokens': max_tokens,
+            'system': [
+                {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+            ],
+            'messages': [
+                {"role": "user", "content": prompt}
+            ]
+        }
+        if deterministic:
+            params['temperature'] = 0
+        return params
+
+    def _parse_response(self, response, model: str) -> Dict:
+        """把 LLM 响应转换为结果字典"""
+        if self.provider == 'openai':
             return {
                 'explanation': response.choices[0].message.content,
-                'model': 'gpt-4',
+                'model': _model_label(model),
                 'provider': 'openai'
             }
 
-        elif self.provider == 'anthropic':
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+        return {
+            'explanation': response.content[0].text,
+            'model': _model_label(model),
+            'provider': 'anthropic'
+        }
 
-            return {
-                'explanation': response.content[0].text,
-                'model': 'claude-3-5-sonnet',
-                'provider': 'anthropic'
-            }
+    def _cache_key(self, params: Dict) -> Optional[str]:
+        """
+        根据 provider 和完整请求参数计算缓存键
+
+        只有 temperature 为 0 的请求结果是确定的；采样请求返回 None，不缓存。
+        """
+        if params.get('temperature') != 0:
+            return None
+        payload = _dumps({'provider': self.provider, 'params': params}, sort_keys=True)
+        return hashlib.sha256(payload).hexdigest()
+
+    def _cache_get(self, key: Optional[str]) -> Optional[Dict]:
+        """查询缓存，命中时刷新 LRU 顺序"""
+        if not self.cache_size or key is None:
+            return None
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                self.cache_misses += 1
+                return None
+
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+        return dict(cached)
+
+    def _cache_put(self, key: Optional[str], result: Dict):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if not self.cache_size or key is None or not result:
+            return
+
+        with self._cache_lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _call_llm(self, prompt: str, max_tokens: int = 1000, stream: bool = False,
+                  model: Optional[str] = None, system: str = _SYSTEM_PROMPT,
+                  deterministic: bool = False):
+        """
+        调用 LLM API
+
+        stream 为 True 时返回逐段产出文本的生成器，否则返回结果字典；
+        deterministic 含义同 _request_params。
+        """
+        if stream:
+            return self._stream_llm(prompt, max_tokens, model, system, deterministic)
+
+        if self.provider not in ('openai', 'anthropic'):
+            return {}
+
+        params = self._request_params(prompt, max_tokens, model, system, deterministic)
+        key = self._cache_key(params)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        self._ensure_client()
+        if self.provider == 'openai':
+            response = self.client.chat.completions.create(**params)
+        else:
+            response = self.client.messages.create(**params)
+
+        result = self._parse_response(response, params['model'])
+        self._cache_put(key, result)
+        return result
+
+    def _stream_llm(self, prompt: str, max_tokens: int, model: Optional[str] = None,
+                    system: str = _SYSTEM_PROMPT, deterministic: bool = False) -> Iterator[str]:
+        """流式调用 LLM API，完整结果生成后写入缓存"""
+        if self.provider not in ('openai', 'anthropic'):
+            return
+
+        params = self._request_params(prompt, max_tokens, model, system, deterministic)
+        key = self._cache_key(params)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached.get('explanation', '')
+            return
+
+        self._ensure_client()
+        parts = []
+        if self.provider == 'openai':
+            for chunk in self.client.chat.completions.create(**params, stream=True):
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    yield text
+        else:
+            for event in self.client.messages.create(**params, stream=True):
+                if event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                    parts.append(event.delta.text)
+                    yield event.delta.text
+
+        self._cache_put(key, {
+            'explanation': ''.join(parts),
+            'model': _model_label(params['model']),
+            'provider': self.provider
+        })
+
+    async def _call_llm_async(self, prompt: str, max_tokens: int = 1000,
+                              model: Optional[str] = None, system: str = _SYSTEM_PROMPT,
+                              deterministic: bool = False) -> Dict:
+        """
+        异步调用 LLM API
+
+        受并发数和每分钟请求 / token 预算限制；
+        遇到 429 或 5xx 时按指数退避重试，最多 max_attempts 次。
+        """
+        if self.provider not in ('openai', 'anthropic'):
+            return {}
+
+        params = self._request_params(prompt, max_tokens, model, system, deterministic)
+        key = self._cache_key(params)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        # 输入 token 估算值加上输出上限
+        estimated_tokens = sum(_estimate_tokens(m['content']) for m in params['messages']) + params['max_tokens']
+
+        self._ensure_client()
+        limiter = self._get_limiter()
+        async with limiter.semaphore:
+            for attempt in range(1, self.max_attempts + 1):
+                await limiter.acquire(estimated_tokens)
+                try:
+                    if self.provider == 'openai':
+                        response = await self.async_client.chat.completions.create(**params)
+                    else:
+                        response = await self.async_client.messages.create(**params)
+                    result = self._parse_response(response, params['model'])
+                    self._cache_put(key, result)
+                    return result
+                except Exception as e:
+                    if attempt == self.max_attempts or not _is_retryable(e):
+                        raise
+                    delay = min(2 ** (attempt - 1), 30) + random.uniform(0, 1)
+                    print(f"LLM 请求失败（第 {attempt} 次）: {e}，{delay:.1f}s 后重试")
+                    await asyncio.sleep(delay)
 
         return {}
 
+    def _get_limiter(self) -> _RateLimiter:
+        """获取当前事件循环对应的限流器（信号量不能跨事件循环使用）"""
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter.loop is not loop:
+            self._limiter = _RateLimiter(
+                self.max_concurrent,
+                self.max_requests_per_minute,
+                self.max_tokens_per_minute
+            )
+        return self._limiter
+
     def chat(self, message: str, context: Dict) -> str:
         """
         对话式调试助手
@@ -173,6 +884,7 @@ class AIDebugAgent:
         if not self.enabled:
             return "AI 对话功能未启用。请设置 API 密钥。"
 
+        budget = self._estimate_chat_budget(message)
         prompt = f"""基于以下调试上下文，回答学生的问题。
 
 ## 上下文
@@ -182,11 +894,11 @@ class AIDebugAgent:
 ## 学生问题
 {message}
 
-请提供清晰、教育性的回答。
+请提供清晰、教育性的回答。请在 {budget} tokens 内作答。
 """
 
         try:
-            result = self._call_llm(prompt)
+            result = self._call_llm(prompt, max_tokens=budget)
             return result.get('explanation', '无法生成回答')
         except Exception as e:
             return f"对话出错: {e}"
@@ -1,31 +1,129 @@
-"""Analyzer for GDB output."""
-
-from typing import Dict, List, Optional
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from parsers.gdb_parser import GDBParser
+"""
+Analyzer for GDB output.
+
+This module is fully type-annotated so it can optionally be compiled with
+mypyc (run ``mypyc analyzers/gdb_analyzer.py`` from ``backend/``). Python
+imports the compiled extension in preference to this file when present;
+the pure-Python source stays the fallback.
+"""
+
+from typing import Any, Dict, List, Tuple
+import re
+
+from parsers.gdb_parser import Frame, GDBParser
+
+
+_HEX_RE: "re.Pattern[str]" = re.compile(r'^0x[0-9a-fA-F]+$')
+
+# Human-readable register descriptions
+_REG_DESCRIPTIONS: Dict[str, str] = {
+    # x86-64
+    'rax': 'Accumulator register (return value)',
+    'rbx': 'Base register',
+    'rcx': 'Counter register',
+    'rdx': 'Data register',
+    'rsi': 'Source index (2nd argument)',
+    'rdi': 'Destination index (1st argument)',
+    'rbp': 'Base pointer (frame pointer)',
+    'rsp': 'Stack pointer',
+    'rip': 'Instruction pointer (program counter)',
+    # x86-32
+    'eax': 'Accumulator register (return value)',
+    'ebx': 'Base register',
+    'ecx': 'Counter register',
+    'edx': 'Data register',
+    'esi': 'Source index',
+    'edi': 'Destination index',
+    'ebp': 'Base pointer (frame pointer)',
+    'esp': 'Stack pointer',
+    'eip': 'Instruction pointer (program counter)',
+    # RISC-V
+    'ra': 'Return address',
+    'sp': 'Stack pointer',
+    'gp': 'Global pointer',
+    'tp': 'Thread pointer',
+    'pc': 'Program counter',
+    'a0': 'Argument/return value 0',
+    'a1': 'Argument/return value 1',
+    's0': 'Saved register 0 / frame pointer',
+    's1': 'Saved register 1',
+}
+# Function names that indicate an assertion failure
+_ASSERT_FUNCTIONS: "frozenset[str]" = frozenset({'assert', '__assert_fail', 'assertion'})
+
+_X86_NULL_MSG_ONE = ("Register {regs} is 0x0 (NULL). "
+                     "If this register is being dereferenced, it will cause a segmentation fault.")
+_X86_NULL_MSG_MANY = ("Registers {regs} are 0x0 (NULL). "
+                      "If any of these registers is being dereferenced, it will cause a segmentation fault.")
+
+# Per-architecture register roles used by the register checks
+_ARCH_REGISTERS: Dict[str, Dict[str, Any]] = {
+    'x86_64': {
+        'ip_regs': ('rip',),
+        'ip_label': 'RIP',
+        'ip_desc': 'instruction pointer',
+        'ip_category': 'invalid_ip',
+        'bad_ip_values': frozenset({0, 0xdeadbeef, 0xcccccccc}),
+        'sp_reg': 'rsp',
+        # Commonly dereferenced registers
+        'null_regs': ('rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi'),
+        'null_severity': 'warning',
+        'null_category': 'null_pointer',
+        'null_msg_one': _X86_NULL_MSG_ONE,
+        'null_msg_many': _X86_NULL_MSG_MANY,
+        'upper_names': True,
+    },
+    'x86_32': {
+        'ip_regs': ('eip',),
+        'ip_label': 'EIP',
+        'ip_desc': 'instruction pointer',
+        'ip_category': 'invalid_ip',
+        'bad_ip_values': frozenset({0, 0xdeadbeef, 0xcccccccc}),
+        'sp_reg': 'esp',
+        'null_regs': ('eax', 'ebx', 'ecx', 'edx', 'esi', 'edi'),
+        'null_severity': 'warning',
+        'null_category': 'null_pointer',
+        'null_msg_one': _X86_NULL_MSG_ONE,
+        'null_msg_many': _X86_NULL_MSG_MANY,
+        'upper_names': True,
+    },
+    'riscv': {
+        'ip_regs': ('pc', 'sepc'),
+        'ip_label': 'PC',
+        'ip_desc': 'program counter',
+        'ip_category': 'invalid_pc',
+        'bad_ip_values': frozenset({0, 0xdeadbeef}),
+        'sp_reg': 'sp',
+        # Argument/saved registers
+        'null_regs': tuple(f'{prefix}{i}' for i in range(8) for prefix in ('a', 's')),
+        'null_severity': 'info',
+        'null_category': 'null_value',
+        'null_msg_one': "Register {regs} is 0x0 (NULL/zero).",
+        'null_msg_many': "Registers {regs} are 0x0 (NULL/zero).",
+        'upper_names': False,
+    },
+}
 
 
 class GDBAnalyzer:
     """Analyze GDB output and provide insights."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.parser = GDBParser()
 
     def analyze(self, text: str) -> Dict:
         """
         Analyze GDB output (backtrace, registers, etc.).
 
+        Not cached here: HypothesisEngine, the only caller, caches the
+        whole analysis by input text.
+
         Returns a dict with:
         - backtrace_analysis
         - register_analysis
         - findings (list of issues/insights)
         """
-        result = {
+        result: Dict[str, Any] = {
             'backtrace_analysis': None,
             'register_analysis': None,
             'findings': [],
@@ -37,7 +135,7 @@ class GDBAnalyzer:
         result['arch'] = arch
 
         # Parse and analyze backtrace
-        backtrace = self.parser.parse_backtrace(text)
+        backtrace = self.parser.parse_backtrace_frames(text)
         if backtrace:
             result['backtrace_analysis'] = self._analyze_backtrace(backtrace)
 
@@ -54,49 +152,43 @@ class GDBAnalyzer:
 
         return result
 
-    def _analyze_backtrace(self, backtrace: List[Dict]) -> Dict:
+    def _analyze_backtrace(self, backtrace: List[Frame]) -> Dict:
         """Analyze backtrace for common patterns."""
-        analysis = {
+        analysis: Dict[str, Any] = {
             'frames': [],
             'findings': [],
             'summary': ''
         }
 
+        # Collapse runs of identical consecutive frames (deep recursion, stack overflow)
+        groups: List[List[Any]] = []
         for frame in backtrace:
-            frame_info = {
-                'num': frame['frame_num'],
-                'function': frame['function'],
-                'location': f"{frame['file']}:{frame['line']}" if frame['file'] != 'unknown' else 'unknown',
-                'addr': frame['addr'],
-                'description': ''
-            }
-
-            # Generate human-readable description
-            if frame['file'] != 'unknown':
-                frame_info['description'] = (
-                    f"Frame #{frame['frame_num']}: Program stopped in function `{frame['function']}()` "
-                    f"at {frame['file']}:{frame['line']} (address 0x{frame['addr']})"
-                )
+            key: Tuple[str, ...] = (frame.function, frame.file, frame.line)
+            if frame.file == 'unknown':
+                # Without debug info only the address tells frames apart
+                key += (frame.addr,)
+            if groups and groups[-1][0] == key:
+                groups[-1][1] += 1
             else:
-                frame_info['description'] = (
-                    f"Frame #{frame['frame_num']}: In function `{frame['function']}()` "
-                    f"at address 0x{frame['addr']}"
-                )
+                groups.append([key, 1, frame])
 
-            analysis['frames'].append(frame_info)
+        analysis['frames'] = [self._describe_frame(frame, count) for _, count, frame in groups]
 
-        # Check for panic/assert patterns
-        function_names = [f['function'] for f in backtrace]
+        # Index of the first frame for each function name (single pass)
+        first_idx: Dict[str, int] = {}
+        for i, frame in enumerate(backtrace):
+            first_idx.setdefault(frame.function, i)
 
-        if 'panic' in function_names:
-            idx = function_names.index('panic')
+        # Check for panic/assert patterns
+        if 'panic' in first_idx:
+            idx = first_idx['panic']
             if idx + 1 < len(backtrace):
                 caller = backtrace[idx + 1]
                 analysis['findings'].append({
                     'severity': 'high',
                     'category': 'panic',
-                    'message': f"Kernel panic detected. Called from `{caller['function']}()` "
-                               f"in {caller['file']}:{caller['line']}. "
+                    'message': f"Kernel panic detected. Called from `{caller.function}()` "
+                               f"in {caller.file}:{caller.line}. "
                                f"Check this function for assertion failures or explicit panic calls."
                 })
             else:
@@ -106,7 +198,7 @@ class GDBAnalyzer:
                     'message': "Kernel panic detected. This indicates a fatal error was detected."
                 })
 
-        if any(name in function_names for name in ['assert', '__assert_fail', 'assertion']):
+        if not _ASSERT_FUNCTIONS.isdisjoint(first_idx):
             analysis['findings'].append({
                 'severity': 'high',
                 'category': 'assertion',
@@ -117,35 +209,63 @@ class GDBAnalyzer:
         if backtrace:
             top_frame = backtrace[0]
             analysis['summary'] = (
-                f"Program crashed in `{top_frame['function']}()`. "
-                f"Backtrace has {len(backtrace)} frame(s)."
+                f"Program crashed in `{top_frame.function}()`. "
+                f"Backtrace has {len(backtrace)} frame(s)"
             )
+            if len(groups) < len(backtrace):
+                analysis['summary'] += f" ({len(groups)} unique after collapsing repeated frames)"
+            analysis['summary'] += "."
 
         return analysis
 
+    def _describe_frame(self, frame: Frame, count: int = 1) -> Dict:
+        """Build the display info for one backtrace frame repeated `count` times."""
+        if frame.file != 'unknown':
+            location = f"{frame.file}:{frame.line}"
+            description = (
+                f"Frame #{frame.frame_num}: Program stopped in function `{frame.function}()` "
+                f"at {location} (address 0x{frame.addr})"
+            )
+        else:
+            location = 'unknown'
+            description = (
+                f"Frame #{frame.frame_num}: In function `{frame.function}()` "
+                f"at address 0x{frame.addr}"
+            )
+
+        if count > 1:
+            description += f" (repeated {count}×)"
+
+        return {
+            'num': frame.frame_num,
+            'function': frame.function,
+            'location': location,
+            'addr': frame.addr,
+            'repeat': count,
+            'description': description
+        }
+
     def _analyze_registers(self, registers: Dict[str, str], arch: str) -> Dict:
         """Analyze register values for suspicious patterns."""
-        analysis = {
+        analysis: Dict[str, Any] = {
             'registers': {},
             'findings': [],
             'summary': ''
         }
 
         # Convert register values to integers for analysis
-        reg_values = {}
+        reg_values: Dict[str, int] = {}
         for name, value in registers.items():
-            try:
-                reg_values[name] = int(value, 16) if value.startswith('0x') else int(value)
-            except ValueError:
-                continue
+            if _HEX_RE.match(value):
+                reg_values[name] = int(value, 16)
+            elif value.isdigit():
+                reg_values[name] = int(value)
 
         # Architecture-specific analysis
-        if arch == 'x86_64':
-            self._analyze_x86_64_registers(reg_values, analysis)
-        elif arch == 'x86_32':
-            self._analyze_x86_32_registers(reg_values, analysis)
-        elif arch == 'riscv':
-            self._analyze_riscv_registers(reg_values, analysis)
+        spec = _ARCH_REGISTERS.get(arch)
+        if spec:
+            self._check_ip_sp(reg_values, spec, analysis)
+            self._check_null_regs(reg_values, spec, analysis)
 
         # Store formatted register info
         for name, value in registers.items():
@@ -156,140 +276,43 @@ class GDBAnalyzer:
 
         return analysis
 
-    def _analyze_x86_64_registers(self, regs: Dict[str, int], analysis: Dict):
-        """Analyze x86-64 specific registers."""
-        # Check instruction pointer
-        if 'rip' in regs:
-            rip = regs['rip']
-            if rip == 0 or rip == 0xdeadbeef or rip == 0xcccccccc:
+    def _check_ip_sp(self, regs: Dict[str, int], spec: Dict[str, Any], analysis: Dict) -> None:
+        """Check the instruction/program counter and stack pointer."""
+        ip_name = next((name for name in spec['ip_regs'] if name in regs), None)
+        if ip_name is not None:
+            ip = regs[ip_name]
+            if ip in spec['bad_ip_values']:
                 analysis['findings'].append({
                     'severity': 'critical',
-                    'category': 'invalid_ip',
-                    'message': f"Invalid instruction pointer (RIP = 0x{rip:x}). "
+                    'category': spec['ip_category'],
+                    'message': f"Invalid {spec['ip_desc']} ({spec['ip_label']} = 0x{ip:x}). "
                                f"This likely indicates memory corruption or an invalid function pointer."
                 })
 
-        # Check stack pointer
-        if 'rsp' in regs:
-            rsp = regs['rsp']
-            if rsp == 0:
-                analysis['findings'].append({
-                    'severity': 'critical',
-                    'category': 'invalid_sp',
-                    'message': "Stack pointer (RSP) is null. Stack is corrupted."
-                })
-
-        # Check for null pointers in commonly dereferenced registers
-        for reg in ['rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi']:
-            if reg in regs and regs[reg] == 0:
-                analysis['findings'].append({
-                    'severity': 'warning',
-                    'category': 'null_pointer',
-                    'message': f"Register {reg.upper()} is 0x0 (NULL). "
-                               f"If this register is being dereferenced, it will cause a segmentation fault."
-                })
-
-    def _analyze_x86_32_registers(self, regs: Dict[str, int], analysis: Dict):
-        """Analyze x86-32 specific registers."""
-        # Check instruction pointer
-        if 'eip' in regs:
-            eip = regs['eip']
-            if eip == 0 or eip == 0xdeadbeef or eip == 0xcccccccc:
-                analysis['findings'].append({
-                    'severity': 'critical',
-                    'category': 'invalid_ip',
-                    'message': f"Invalid instruction pointer (EIP = 0x{eip:x}). "
-                               f"This likely indicates memory corruption or an invalid function pointer."
-                })
-
-        # Check stack pointer
-        if 'esp' in regs:
-            esp = regs['esp']
-            if esp == 0:
-                analysis['findings'].append({
-                    'severity': 'critical',
-                    'category': 'invalid_sp',
-                    'message': "Stack pointer (ESP) is null. Stack is corrupted."
-                })
-
-        # Check for null pointers
-        for reg in ['eax', 'ebx', 'ecx', 'edx', 'esi', 'edi']:
-            if reg in regs and regs[reg] == 0:
-                analysis['findings'].append({
-                    'severity': 'warning',
-                    'category': 'null_pointer',
-                    'message': f"Register {reg.upper()} is 0x0 (NULL). "
-                               f"If this register is being dereferenced, it will cause a segmentation fault."
-                })
+        sp_name = spec['sp_reg']
+        if regs.get(sp_name, 1) == 0:
+            analysis['findings'].append({
+                'severity': 'critical',
+                'category': 'invalid_sp',
+                'message': f"Stack pointer ({sp_name.upper()}) is null. Stack is corrupted."
+            })
 
-    def _analyze_riscv_registers(self, regs: Dict[str, int], analysis: Dict):
-        """Analyze RISC-V specific registers."""
-        # Check program counter
-        if 'pc' in regs or 'sepc' in regs:
-            pc = regs.get('pc', regs.get('sepc', 0))
-            if pc == 0 or pc == 0xdeadbeef:
-                analysis['findings'].append({
-                    'severity': 'critical',
-                    'category': 'invalid_pc',
-                    'message': f"Invalid program counter (PC = 0x{pc:x}). "
-                               f"This likely indicates memory corruption or an invalid function pointer."
-                })
+    def _check_null_regs(self, regs: Dict[str, int], spec: Dict[str, Any], analysis: Dict) -> None:
+        """Emit one finding listing every candidate register that is zero."""
+        nulls = [name for name in spec['null_regs'] if regs.get(name, 1) == 0]
+        if not nulls:
+            return
 
-        # Check stack pointer
-        if 'sp' in regs:
-            sp = regs['sp']
-            if sp == 0:
-                analysis['findings'].append({
-                    'severity': 'critical',
-                    'category': 'invalid_sp',
-                    'message': "Stack pointer (SP) is null. Stack is corrupted."
-                })
+        if spec['upper_names']:
+            nulls = [name.upper() for name in nulls]
+        template = spec['null_msg_one'] if len(nulls) == 1 else spec['null_msg_many']
 
-        # Check argument/saved registers for null
-        for i in range(8):
-            for prefix in ['a', 's']:
-                reg = f'{prefix}{i}'
-                if reg in regs and regs[reg] == 0:
-                    analysis['findings'].append({
-                        'severity': 'info',
-                        'category': 'null_value',
-                        'message': f"Register {reg} is 0x0 (NULL/zero)."
-                    })
+        analysis['findings'].append({
+            'severity': spec['null_severity'],
+            'category': spec['null_category'],
+            'message': template.format(regs=', '.join(nulls))
+        })
 
     def _get_register_description(self, name: str, value: str, arch: str) -> str:
         """Get human-readable description of a register."""
-        descriptions = {
-            # x86-64
-            'rax': 'Accumulator register (return value)',
-            'rbx': 'Base register',
-            'rcx': 'Counter register',
-            'rdx': 'Data register',
-            'rsi': 'Source index (2nd argument)',
-            'rdi': 'Destination index (1st argument)',
-            'rbp': 'Base pointer (frame pointer)',
-            'rsp': 'Stack pointer',
-            'rip': 'Instruction pointer (program counter)',
-            # x86-32
-            'eax': 'Accumulator register (return value)',
-            'ebx': 'Base register',
-            'ecx': 'Counter register',
-            'edx': 'Data register',
-            'esi': 'Source index',
-            'edi': 'Destination index',
-            'ebp': 'Base pointer (frame pointer)',
-            'esp': 'Stack pointer',
-            'eip': 'Instruction pointer (program counter)',
-            # RISC-V
-            'ra': 'Return address',
-            'sp': 'Stack pointer',
-            'gp': 'Global pointer',
-            'tp': 'Thread pointer',
-            'pc': 'Program counter',
-            'a0': 'Argument/return value 0',
-            'a1': 'Argument/return value 1',
-            's0': 'Saved register 0 / frame pointer',
-            's1': 'Saved register 1',
-        }
-
-        desc = descriptions.get(name.lower(), name.upper())
-        return f"{desc} = {value}"
+        return f"{_REG_DESCRIPTIONS.get(name.lower(), name.upper())} = {value}"
@@ -1,23 +1,250 @@
 """Hypothesis Engine - Integrates all analyzers to generate hypotheses."""
 
-from typing import Dict, List
-import sys
-import os
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Optional
+import hashlib
+import re
+import threading
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from analyzers.gdb_analyzer import GDBAnalyzer
-from analyzers.trapframe_analyzer import TrapframeAnalyzer
-from analyzers.pagetable_analyzer import PageTableAnalyzer
+from .gdb_analyzer import GDBAnalyzer
+from .trapframe_analyzer import TrapframeAnalyzer
+from .pagetable_analyzer import PageTableAnalyzer
 
 # 可选的 AI agent
 try:
-    from analyzers.ai_agent import AIDebugAgent
+    from .ai_agent import get_ai_agent
     AI_AVAILABLE = True
 except ImportError:
     AI_AVAILABLE = False
 
 
+# Matched against lower-cased backtrace function names; one alternation
+# scans each name once instead of looping over the needles in Python
+_SYSCALL_FUNC_RE = re.compile(r'syscall|usertrap|copyin|copyout|fetchstr|argaddr')
+_SYSCALL_PATH_RE = re.compile(r'syscall|copyin|copyout|trap')
+
+# Case-insensitive searches that replace lower() + 'in', saving a lowered copy per string
+_PAGE_FAULT_RE = re.compile(r'page fault', re.IGNORECASE | re.ASCII)
+_STACK_RE = re.compile(r'stack', re.IGNORECASE | re.ASCII)
+
+_PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _collect_facts(gdb, trapframe, pagetable) -> Dict:
+    """
+    Extract everything the scenario detectors look at in a single pass,
+    so each detector is a cheap lookup instead of another walk over the
+    analyzer results.
+    """
+    exception = (trapframe or {}).get('exception_info') or {}
+    bt_frames = ((gdb or {}).get('backtrace_analysis') or {}).get('frames', [])
+    trap_desc = exception.get('trap_name', '') or exception.get('description', '') or ''
+
+    # Trapframe findings indexed by category, plus the stack check, in one pass
+    tf_by_category: Dict[str, List[Dict]] = {}
+    tf_msg_has_stack = False
+    for finding in (trapframe or {}).get('findings', []):
+        tf_by_category.setdefault(finding.get('category'), []).append(finding)
+        if not tf_msg_has_stack and _STACK_RE.search(finding.get('message', '')):
+            tf_msg_has_stack = True
+
+    return {
+        'has_exception': bool(exception),
+        'trap_name': exception.get('trap_name'),
+        'is_page_fault': _PAGE_FAULT_RE.search(trap_desc) is not None,
+        'tf_by_category': tf_by_category,
+        'tf_msg_has_stack': tf_msg_has_stack,
+        'err': (trapframe or {}).get('error_code_analysis') or {},
+        'bt_frames': bt_frames,
+        # Lower-cased once here for all the detectors
+        'bt_funcs_lower': [(fr.get('function') or '').lower() for fr in bt_frames],
+        'pt_critical': [f for f in (pagetable or {}).get('findings', [])
+                        if f.get('severity') in ('critical', 'high')],
+    }
+
+
+# Each detector returns the evidence list when its scenario applies, None otherwise
+
+def _detect_kernel_null_pointer(facts: Dict) -> Optional[List[str]]:
+    """Page fault (x86 "Page Fault" or RISC-V "Load/Store Page Fault") on a null pointer."""
+    null_findings = facts['tf_by_category'].get('null_pointer')
+    if not facts['is_page_fault'] or not null_findings:
+        return None
+
+    evidence = [f"Trapframe: {finding.get('message', '').split(chr(10))[0]}"
+                for finding in null_findings]
+    if facts['bt_frames']:
+        top_frame = facts['bt_frames'][0]
+        evidence.append(f"Crashed in: {top_frame.get('function')} at {top_frame.get('location')}")
+    return evidence
+
+
+def _detect_user_stack_overflow(facts: Dict) -> Optional[List[str]]:
+    """Stack-related fault, or any fault raised from user mode."""
+    if not facts['has_exception']:
+        return None
+
+    # Additional heuristic for user mode: check faulting address
+    # (would need CR2/STVAL parsing)
+    user_mode = facts['err'].get('user_mode')
+    if not facts['tf_msg_has_stack'] and not user_mode:
+        return None
+    return ["Page fault occurred in user mode"] if user_mode else []
+
+
+def _detect_invalid_syscall_arg(facts: Dict) -> Optional[List[str]]:
+    """Kernel-mode fault while in a syscall-related function."""
+    err = facts['err']
+    if not err or err.get('user_mode'):
+        return None
+    search = _SYSCALL_FUNC_RE.search
+    if not any(search(name) for name in facts['bt_funcs_lower']):
+        return None
+
+    evidence = [f"In syscall path: {frame.get('function', '')}"
+                for frame, name in zip(facts['bt_frames'], facts['bt_funcs_lower'])
+                if _SYSCALL_PATH_RE.search(name)]
+    evidence.append("Kernel mode page fault (kernel handling user data)")
+    return evidence
+
+
+def _detect_pagetable_issue(facts: Dict) -> Optional[List[str]]:
+    """Page table analysis reported a critical or high severity finding."""
+    if not facts['pt_critical']:
+        return None
+    return [finding.get('message', '').split('\n')[0] for finding in facts['pt_critical']]
+
+
+def _detect_write_to_readonly(facts: Dict) -> Optional[List[str]]:
+    """Write to a read-only page."""
+    if 'write_to_readonly' not in facts['tf_by_category']:
+        return None
+    err = facts['err']
+    if err.get('write') and err.get('present'):
+        return ["Write operation to present page (protection violation)"]
+    return []
+
+
+def _detect_general_protection(facts: Dict) -> Optional[List[str]]:
+    """General protection fault."""
+    if facts['trap_name'] != 'General Protection':
+        return None
+    return [f"Exception: {facts['trap_name']}"]
+
+
+# (detector, hypothesis template)
+_SCENARIOS = (
+    # Scenario 1: Kernel null pointer dereference
+    (_detect_kernel_null_pointer, {
+        'priority': 'high',
+        'scenario': 'Kernel Null Pointer Dereference',
+        'explanation': (
+            "The kernel attempted to dereference a null or near-null pointer. "
+            "This is one of the most common bugs in OS development."
+        ),
+        'suggestions': (
+            "Check the backtrace to identify which function caused the panic/fault",
+            "Look for uninitialized pointers or missing null checks",
+            "Common culprits: struct member access (ptr->field) where ptr is NULL",
+            "Use GDB to print variables: p <variable_name>",
+            "Add assertions to validate pointers before dereferencing"
+        )
+    }),
+
+    # Scenario 2: User program stack overflow
+    (_detect_user_stack_overflow, {
+        'priority': 'high',
+        'scenario': 'User Program Stack Overflow',
+        'explanation': (
+            "The user program's stack grew beyond its allocated region, "
+            "causing a page fault when trying to access memory below the stack base."
+        ),
+        'suggestions': (
+            "Check for large local variables (e.g., char buf[8192]) in user program",
+            "Look for infinite recursion in user code",
+            "Verify that user stack size is sufficient",
+            "Check if USTACKSIZE is properly defined",
+            "Try reducing local variable sizes or moving them to heap"
+        )
+    }),
+
+    # Scenario 3: Invalid syscall argument
+    (_detect_invalid_syscall_arg, {
+        'priority': 'high',
+        'scenario': 'Invalid System Call Argument',
+        'explanation': (
+            "A system call received an invalid pointer from user space. "
+            "The kernel tried to copy data from/to this address and faulted."
+        ),
+        'suggestions': (
+            "Check syscall argument validation (e.g., argaddr, argint functions)",
+            "Verify that copyin/copyout functions are being used correctly",
+            "Ensure user pointers are within valid user address range",
+            "Check for NULL pointers passed from user space",
+            "Validate that user buffers don't cross page boundaries incorrectly"
+        )
+    }),
+
+    # Scenario 4: Page table misconfiguration
+    (_detect_pagetable_issue, {
+        'priority': 'high',
+        'scenario': 'Page Table Misconfiguration',
+        'explanation': (
+            "The page tables are not set up correctly, causing improper memory access."
+        ),
+        'suggestions': (
+            "Review the page table setup code (mappages, walkpgdir, etc.)",
+            "Check that all required mappings are created (kernel, user, devices)",
+            "Verify permission bits are set correctly (P, W, U flags)",
+            "Ensure kernel mappings are NOT marked as user-accessible",
+            "Check that physical addresses are valid and properly aligned"
+        )
+    }),
+
+    # Scenario 5: Write to read-only page (Copy-on-Write)
+    (_detect_write_to_readonly, {
+        'priority': 'medium',
+        'scenario': 'Write to Read-Only Page (Possible COW)',
+        'explanation': (
+            "Attempted to write to a read-only page. If implementing copy-on-write (COW), "
+            "this is expected and should be handled in the page fault handler."
+        ),
+        'suggestions': (
+            "If implementing COW: handle this in usertrap/trap handler",
+            "Allocate a new physical page",
+            "Copy contents from the old page to new page",
+            "Update page table to point to new page with write permissions",
+            "If NOT implementing COW: check why page is marked read-only"
+        )
+    }),
+
+    # Scenario 6: General Protection Fault / Invalid Operation
+    (_detect_general_protection, {
+        'priority': 'high',
+        'scenario': 'General Protection Fault / Invalid Operation',
+        'explanation': (
+            "A general protection fault indicates a privilege violation or invalid operation."
+        ),
+        'suggestions': (
+            "Check for user mode trying to execute privileged instructions",
+            "Verify segment selector values",
+            "Look for corrupted function pointers",
+            "Check for invalid memory accesses"
+        )
+    }),
+)
+
+# Order the table by priority once at import (stable, so scenarios of equal
+# priority keep their listed order); hypotheses are then emitted already sorted.
+# Templates are read-only: every hypothesis shares its template's suggestions tuple.
+_SCENARIOS = tuple(
+    (detect, MappingProxyType(template))
+    for detect, template in sorted(
+        _SCENARIOS, key=lambda entry: _PRIORITY_ORDER.get(entry[1]['priority'], 3))
+)
+
+
 class HypothesisEngine:
     """
     Intelligent hypothesis engine that combines all analyzers
@@ -26,26 +253,77 @@ class HypothesisEngine:
     支持可选的 AI 增强功能。
     """
 
-    def __init__(self, enable_ai: bool = False):
+    def __init__(self, enable_ai: bool = False, cache_size: int = 32):
         self.gdb_analyzer = GDBAnalyzer()
         self.trapframe_analyzer = TrapframeAnalyzer()
         self.pagetable_analyzer = PageTableAnalyzer()
 
+        # LRU cache of rule-based results keyed by a digest of the input text
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         # 可选的 AI agent
         self.ai_agent = None
         if enable_ai and AI_AVAILABLE:
-            self.ai_agent = AIDebugAgent()
+            # 使用全局实例，所有引擎共享同一个 HTTP 连接池和响应缓存
+            self.ai_agent = get_ai_agent()
             if self.ai_agent.enabled:
                 print("✓ AI 增强已启用")
             else:
                 self.ai_agent = None
 
-    def analyze(self, text: str) -> Dict:
+    def analyze(self, text: str, use_ai: bool = True) -> Dict:
         """
         Main analysis entry point.
 
         Runs all analyzers and generates a comprehensive report with hypotheses.
+
+        Args:
+            text: Raw debugging output
+            use_ai: Whether to run the (blocking) AI enhancement step. Callers
+                    that stream AI insights separately pass False.
+
+        The rule-based part of the result is cached by input text, so
+        re-analyzing the same dump (page refresh, tab switch) skips all three
+        analyzers. The cached dict is shared between calls, so callers must
+        treat the result as read-only.
         """
+        result = self._analyze_cached(text)
+
+        # 可选：使用 AI 增强分析（合并到浅拷贝中，不修改缓存的结果）
+        if self.ai_agent and use_ai:
+            try:
+                result = self.ai_agent.enhance_analysis(result, text)
+            except Exception as e:
+                print(f"AI 增强失败: {e}")
+                # 继续使用基础分析结果
+
+        return result
+
+    def _analyze_cached(self, text: str) -> Dict:
+        """Rule-based analysis, served from the LRU cache when possible."""
+        if not self.cache_size:
+            return self._analyze_rules(text)
+
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        result = self._analyze_rules(text)
+
+        with self._cache_lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _analyze_rules(self, text: str) -> Dict:
+        """Run all analyzers and correlate their findings into hypotheses."""
         result = {
             'gdb_analysis': None,
             'trapframe_analysis': None,
@@ -57,17 +335,25 @@ class HypothesisEngine:
 
         # Run individual analyzers
         gdb_result = self.gdb_analyzer.analyze(text)
+        trapframe_result = self.trapframe_analyzer.analyze_result(text)
+        pagetable_result = self.pagetable_analyzer.analyze(text)
+
         if gdb_result.get('findings') or gdb_result.get('backtrace_analysis'):
             result['gdb_analysis'] = gdb_result
 
-        trapframe_result = self.trapframe_analyzer.analyze(text)
-        if trapframe_result.get('exception_info'):
-            result['trapframe_analysis'] = trapframe_result
+        if trapframe_result.exception_info:
+            result['trapframe_analysis'] = trapframe_result.to_dict()
 
-        pagetable_result = self.pagetable_analyzer.analyze(text)
         if pagetable_result.get('mappings'):
             result['pagetable_analysis'] = pagetable_result
 
+        # Nothing recognizable in the text (common for live-streamed chunks):
+        # no findings or hypotheses to correlate
+        if not (result['gdb_analysis'] or result['trapframe_analysis']
+                or result['pagetable_analysis']):
+            result['summary'] = 'Analysis complete'
+            return result
+
         # Collect all findings
         all_findings = []
         if result['gdb_analysis']:
@@ -89,304 +375,29 @@ class HypothesisEngine:
         # Generate executive summary
         result['summary'] = self._generate_summary(result)
 
-        # 可选：使用 AI 增强分析
-        if self.ai_agent:
-            try:
-                result = self.ai_agent.enhance_analysis(result, text)
-            except Exception as e:
-                print(f"AI 增强失败: {e}")
-                # 继续使用基础分析结果
-
         return result
 
     def _generate_hypotheses(self, gdb_analysis, trapframe_analysis, pagetable_analysis) -> List[Dict]:
         """
         Generate prioritized hypotheses by correlating findings from all analyzers.
         """
+        facts = _collect_facts(gdb_analysis, trapframe_analysis, pagetable_analysis)
         hypotheses = []
 
-        # Scenario 1: Kernel null pointer dereference
-        if self._detect_kernel_null_pointer(gdb_analysis, trapframe_analysis):
-            hypotheses.append({
-                'priority': 'high',
-                'scenario': 'Kernel Null Pointer Dereference',
-                'evidence': self._collect_null_pointer_evidence(gdb_analysis, trapframe_analysis),
-                'explanation': (
-                    "The kernel attempted to dereference a null or near-null pointer. "
-                    "This is one of the most common bugs in OS development."
-                ),
-                'suggestions': [
-                    "Check the backtrace to identify which function caused the panic/fault",
-                    "Look for uninitialized pointers or missing null checks",
-                    "Common culprits: struct member access (ptr->field) where ptr is NULL",
-                    "Use GDB to print variables: p <variable_name>",
-                    "Add assertions to validate pointers before dereferencing"
-                ]
-            })
-
-        # Scenario 2: User program stack overflow
-        if self._detect_user_stack_overflow(trapframe_analysis):
-            hypotheses.append({
-                'priority': 'high',
-                'scenario': 'User Program Stack Overflow',
-                'evidence': self._collect_stack_overflow_evidence(trapframe_analysis),
-                'explanation': (
-                    "The user program's stack grew beyond its allocated region, "
-                    "causing a page fault when trying to access memory below the stack base."
-                ),
-                'suggestions': [
-                    "Check for large local variables (e.g., char buf[8192]) in user program",
-                    "Look for infinite recursion in user code",
-                    "Verify that user stack size is sufficient",
-                    "Check if USTACKSIZE is properly defined",
-                    "Try reducing local variable sizes or moving them to heap"
-                ]
-            })
-
-        # Scenario 3: Invalid syscall argument
-        if self._detect_invalid_syscall_arg(gdb_analysis, trapframe_analysis):
-            hypotheses.append({
-                'priority': 'high',
-                'scenario': 'Invalid System Call Argument',
-                'evidence': self._collect_syscall_evidence(gdb_analysis, trapframe_analysis),
-                'explanation': (
-                    "A system call received an invalid pointer from user space. "
-                    "The kernel tried to copy data from/to this address and faulted."
-                ),
-                'suggestions': [
-                    "Check syscall argument validation (e.g., argaddr, argint functions)",
-                    "Verify that copyin/copyout functions are being used correctly",
-                    "Ensure user pointers are within valid user address range",
-                    "Check for NULL pointers passed from user space",
-                    "Validate that user buffers don't cross page boundaries incorrectly"
-                ]
-            })
-
-        # Scenario 4: Page table misconfiguration
-        if self._detect_pagetable_issue(pagetable_analysis, trapframe_analysis):
-            hypotheses.append({
-                'priority': 'high',
-                'scenario': 'Page Table Misconfiguration',
-                'evidence': self._collect_pagetable_evidence(pagetable_analysis, trapframe_analysis),
-                'explanation': (
-                    "The page tables are not set up correctly, causing improper memory access."
-                ),
-                'suggestions': [
-                    "Review the page table setup code (mappages, walkpgdir, etc.)",
-                    "Check that all required mappings are created (kernel, user, devices)",
-                    "Verify permission bits are set correctly (P, W, U flags)",
-                    "Ensure kernel mappings are NOT marked as user-accessible",
-                    "Check that physical addresses are valid and properly aligned"
-                ]
-            })
-
-        # Scenario 5: Write to read-only page (Copy-on-Write)
-        if self._detect_write_to_readonly(trapframe_analysis):
-            hypotheses.append({
-                'priority': 'medium',
-                'scenario': 'Write to Read-Only Page (Possible COW)',
-                'evidence': self._collect_readonly_evidence(trapframe_analysis),
-                'explanation': (
-                    "Attempted to write to a read-only page. If implementing copy-on-write (COW), "
-                    "this is expected and should be handled in the page fault handler."
-                ),
-                'suggestions': [
-                    "If implementing COW: handle this in usertrap/trap handler",
-                    "Allocate a new physical page",
-                    "Copy contents from the old page to new page",
-                    "Update page table to point to new page with write permissions",
-                    "If NOT implementing COW: check why page is marked read-only"
-                ]
-            })
-
-        # Scenario 6: General Protection Fault / Invalid Operation
-        if self._detect_general_protection(trapframe_analysis):
-            hypotheses.append({
-                'priority': 'high',
-                'scenario': 'General Protection Fault / Invalid Operation',
-                'evidence': self._collect_general_protection_evidence(trapframe_analysis),
-                'explanation': (
-                    "A general protection fault indicates a privilege violation or invalid operation."
-                ),
-                'suggestions': [
-                    "Check for user mode trying to execute privileged instructions",
-                    "Verify segment selector values",
-                    "Look for corrupted function pointers",
-                    "Check for invalid memory accesses"
-                ]
-            })
-
-        # Sort hypotheses by priority
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        hypotheses.sort(key=lambda h: priority_order.get(h['priority'], 3))
+        # _SCENARIOS is pre-sorted by priority, so no sort is needed here
+        for detect, template in _SCENARIOS:
+            evidence = detect(facts)
+            if evidence is not None:
+                hypotheses.append({
+                    'priority': template['priority'],
+                    'scenario': template['scenario'],
+                    'evidence': evidence,
+                    'explanation': template['explanation'],
+                    'suggestions': template['suggestions']
+                })
 
         return hypotheses
 
-    def _detect_kernel_null_pointer(self, gdb, trapframe) -> bool:
-        """Detect kernel null pointer dereference pattern."""
-        if not trapframe or not trapframe.get('exception_info'):
-            return False
-
-        # Check for page fault (x86 "Page Fault" or RISC-V "Load/Store Page Fault")
-        exception = trapframe['exception_info']
-        trap_desc = (exception.get('trap_name', '') or exception.get('description', '')).lower()
-        is_page_fault = 'page fault' in trap_desc
-
-        if not is_page_fault:
-            return False
-
-        # Check if any finding mentions null pointer
-        findings = trapframe.get('findings', [])
-        for finding in findings:
-            if finding.get('category') == 'null_pointer':
-                return True
-
-        return False
-
-    def _detect_user_stack_overflow(self, trapframe) -> bool:
-        """Detect user stack overflow pattern."""
-        if not trapframe or not trapframe.get('exception_info'):
-            return False
-
-        findings = trapframe.get('findings', [])
-        for finding in findings:
-            if 'stack' in finding.get('message', '').lower():
-                return True
-
-        # Check if error code indicates user mode
-        err_analysis = trapframe.get('error_code_analysis')
-        if err_analysis and err_analysis.get('user_mode'):
-            # Additional heuristic: check faulting address
-            # (would need CR2/STVAL parsing)
-            return True
-
-        return False
-
-    def _detect_invalid_syscall_arg(self, gdb, trapframe) -> bool:
-        """Detect invalid syscall argument pattern."""
-        if not gdb or not trapframe:
-            return False
-
-        # Check backtrace for syscall-related functions
-        bt_analysis = gdb.get('backtrace_analysis')
-        if bt_analysis:
-            frames = bt_analysis.get('frames', [])
-            syscall_funcs = ['syscall', 'usertrap', 'copyin', 'copyout', 'fetchstr', 'argaddr']
-            for frame in frames:
-                if any(func in frame.get('function', '').lower() for func in syscall_funcs):
-                    # And it's a kernel mode page fault
-                    err_analysis = trapframe.get('error_code_analysis')
-                    if err_analysis and not err_analysis.get('user_mode'):
-                        return True
-
-        return False
-
-    def _detect_pagetable_issue(self, pagetable, trapframe) -> bool:
-        """Detect page table configuration issues."""
-        if not pagetable:
-            return False
-
-        findings = pagetable.get('findings', [])
-        critical_findings = [f for f in findings if f.get('severity') in ['critical', 'high']]
-
-        return len(critical_findings) > 0
-
-    def _detect_write_to_readonly(self, trapframe) -> bool:
-        """Detect write to read-only page."""
-        if not trapframe:
-            return False
-
-        findings = trapframe.get('findings', [])
-        for finding in findings:
-            if finding.get('category') == 'write_to_readonly':
-                return True
-
-        return False
-
-    def _detect_general_protection(self, trapframe) -> bool:
-        """Detect general protection fault."""
-        if not trapframe:
-            return False
-
-        exception = trapframe.get('exception_info', {})
-        return exception.get('trap_name') == 'General Protection'
-
-    def _collect_null_pointer_evidence(self, gdb, trapframe) -> List[str]:
-        """Collect evidence for null pointer hypothesis."""
-        evidence = []
-
-        if trapframe:
-            findings = trapframe.get('findings', [])
-            for finding in findings:
-                if finding.get('category') == 'null_pointer':
-                    evidence.append(f"Trapframe: {finding.get('message', '').split(chr(10))[0]}")
-
-        if gdb:
-            bt = gdb.get('backtrace_analysis', {})
-            if bt.get('frames'):
-                top_frame = bt['frames'][0]
-                evidence.append(f"Crashed in: {top_frame.get('function')} at {top_frame.get('location')}")
-
-        return evidence
-
-    def _collect_stack_overflow_evidence(self, trapframe) -> List[str]:
-        """Collect evidence for stack overflow hypothesis."""
-        evidence = []
-        if trapframe:
-            err_analysis = trapframe.get('error_code_analysis', {})
-            if err_analysis.get('user_mode'):
-                evidence.append("Page fault occurred in user mode")
-        return evidence
-
-    def _collect_syscall_evidence(self, gdb, trapframe) -> List[str]:
-        """Collect evidence for invalid syscall argument hypothesis."""
-        evidence = []
-
-        if gdb:
-            bt = gdb.get('backtrace_analysis', {})
-            frames = bt.get('frames', [])
-            for frame in frames:
-                func = frame.get('function', '')
-                if any(s in func.lower() for s in ['syscall', 'copyin', 'copyout', 'trap']):
-                    evidence.append(f"In syscall path: {func}")
-
-        if trapframe:
-            err_analysis = trapframe.get('error_code_analysis', {})
-            if err_analysis and not err_analysis.get('user_mode'):
-                evidence.append("Kernel mode page fault (kernel handling user data)")
-
-        return evidence
-
-    def _collect_pagetable_evidence(self, pagetable, trapframe) -> List[str]:
-        """Collect evidence for page table hypothesis."""
-        evidence = []
-
-        if pagetable:
-            findings = pagetable.get('findings', [])
-            for finding in findings:
-                if finding.get('severity') in ['critical', 'high']:
-                    evidence.append(finding.get('message', '').split('\n')[0])
-
-        return evidence
-
-    def _collect_readonly_evidence(self, trapframe) -> List[str]:
-        """Collect evidence for write-to-readonly hypothesis."""
-        evidence = []
-        if trapframe:
-            err_analysis = trapframe.get('error_code_analysis', {})
-            if err_analysis:
-                if err_analysis.get('write') and err_analysis.get('present'):
-                    evidence.append("Write operation to present page (protection violation)")
-        return evidence
-
-    def _collect_general_protection_evidence(self, trapframe) -> List[str]:
-        """Collect evidence for general protection fault."""
-        evidence = []
-        if trapframe:
-            exception = trapframe.get('exception_info', {})
-            evidence.append(f"Exception: {exception.get('trap_name', 'Unknown')}")
-        return evidence
-
     def _generate_summary(self, result: Dict) -> str:
         """Generate executive summary of the analysis."""
         parts = []
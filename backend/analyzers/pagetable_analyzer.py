@@ -1,18 +1,155 @@
-"""Analyzer for page table dumps."""
+"""
+Analyzer for page table dumps.
 
-from typing import Dict, List
-import sys
-import os
+Like gdb_analyzer, this module is fully type-annotated so it can optionally
+be compiled ahead of time with mypyc (run ``mypyc analyzers/pagetable_analyzer.py``
+from ``backend/``). Python imports the compiled extension in preference to
+this file when present; the pure-Python source stays the fallback.
+"""
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
 from parsers.pagetable_parser import PageTableParser
 
 
+# In both x86 and RISC-V layouts here, kernel space is the high addresses
+_KERNEL_BASE = 0x80000000
+
+# Finding codes produced by the classification pass
+_X86_KERNEL_USER = 1
+_X86_CODE_WRITABLE = 2
+_X86_NOT_PRESENT = 3
+_X86_USER_KERNEL_ONLY = 4
+_RISCV_KERNEL_USER = 5
+_RISCV_WX = 6
+_RISCV_INVALID = 7
+_RISCV_NO_PERMISSIONS = 8
+
+# Kernel address marked as user-accessible, per architecture
+_KERNEL_USER_CODES = {'x86': _X86_KERNEL_USER, 'riscv': _RISCV_KERNEL_USER}
+
+# code -> (severity, category, message template)
+_FINDING_TEMPLATES: Dict[int, Tuple[str, str, str]] = {
+    _X86_KERNEL_USER: (
+        'critical', 'security_violation',
+        "CRITICAL: Kernel address {va} is marked as user-accessible (U bit set)!\n"
+        "  - This is a serious security vulnerability\n"
+        "  - User programs can read/write kernel memory\n"
+        "  - Kernel mappings should NOT have the U (user) bit set"
+    ),
+    _X86_CODE_WRITABLE: (
+        'high', 'code_writable',
+        "WARNING: Kernel code region {va} is marked as writable (W bit set)\n"
+        "  - Code should generally be read-only for security\n"
+        "  - This can enable code injection attacks\n"
+        "  - Consider removing the W bit for executable pages"
+    ),
+    _X86_NOT_PRESENT: (
+        'info', 'not_present',
+        "Page at {va} is not present (P bit = 0)\n"
+        "  - Accessing this address will trigger a page fault\n"
+        "  - This may be intentional (demand paging, copy-on-write)\n"
+        "  - Or it may indicate an incomplete page table setup"
+    ),
+    _X86_USER_KERNEL_ONLY: (
+        'warning', 'user_space_kernel_only',
+        "User space address {va} is marked as kernel-only (U bit = 0)\n"
+        "  - User programs cannot access this address\n"
+        "  - This will cause a page fault in user mode\n"
+        "  - Make sure this is intentional"
+    ),
+    _RISCV_KERNEL_USER: (
+        'critical', 'security_violation',
+        "CRITICAL: Kernel address {va} is marked as user-accessible (U bit set)!\n"
+        "  - This is a serious security vulnerability\n"
+        "  - User programs can access kernel memory\n"
+        "  - Kernel mappings should NOT have the U bit set"
+    ),
+    _RISCV_WX: (
+        'high', 'wx_violation',
+        "WARNING: Page {va} is both writable and executable (W+X)\n"
+        "  - This violates the W^X security principle\n"
+        "  - Pages should be either writable OR executable, not both\n"
+        "  - This enables code injection attacks"
+    ),
+    _RISCV_INVALID: (
+        'info', 'invalid_page',
+        "Page at {va} is not valid (V bit = 0)\n"
+        "  - Accessing this address will trigger a page fault\n"
+        "  - This may be intentional or indicate incomplete setup"
+    ),
+    _RISCV_NO_PERMISSIONS: (
+        'warning', 'no_permissions',
+        "Page {va} is valid but has no R/W/X permissions\n"
+        "  - This is likely a page table directory entry, not a leaf\n"
+        "  - Or an error in permission setup"
+    ),
+}
+
+# Templates split around the address once at import, so materializing a
+# finding is a plain concatenation instead of a str.format parse
+_FINDING_PARTS: Dict[int, Tuple[str, str, str, str]] = {
+    code: (severity, category) + tuple(message.split('{va}'))
+    for code, (severity, category, message) in _FINDING_TEMPLATES.items()
+}
+
+
+@lru_cache(maxsize=None)
+def _x86_finding_codes(kernel: bool, kernel_code: bool, writable: bool,
+                       user: bool, present: bool) -> Tuple[int, ...]:
+    """
+    Classify an x86 page table mapping by its address region and flags.
+
+    Check 1 (kernel space marked as user-accessible) is shared with RISC-V
+    and done by the caller.
+    """
+    codes: List[int] = []
+
+    # Check 2: Kernel code marked as writable
+    if kernel_code and writable:
+        codes.append(_X86_CODE_WRITABLE)
+
+    # Check 3: Page not present
+    if not present:
+        codes.append(_X86_NOT_PRESENT)
+
+    # Check 4: User space marked as non-user
+    if not kernel and not user:
+        codes.append(_X86_USER_KERNEL_ONLY)
+
+    return tuple(codes)
+
+
+@lru_cache(maxsize=None)
+def _riscv_finding_codes(readable: bool, writable: bool, executable: bool,
+                         valid: bool) -> Tuple[int, ...]:
+    """
+    Classify a RISC-V page table mapping by its flags.
+
+    The kernel-space-marked-user check is shared with x86 and done by the caller.
+    """
+    codes: List[int] = []
+
+    # Check for writable + executable (W+X violation)
+    if writable and executable:
+        codes.append(_RISCV_WX)
+
+    # Check for invalid page
+    if not valid:
+        codes.append(_RISCV_INVALID)
+
+    # Check for page with no permissions
+    if not readable and not writable and not executable and valid:
+        codes.append(_RISCV_NO_PERMISSIONS)
+
+    return tuple(codes)
+
+
 class PageTableAnalyzer:
     """Analyze page table dumps and check for common errors."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.parser = PageTableParser()
 
     def analyze(self, text: str) -> Dict:
@@ -24,7 +161,7 @@ class PageTableAnalyzer:
         - visualization
         - findings (errors/warnings)
         """
-        result = {
+        result: Dict[str, Any] = {
             'mappings': [],
             'visualization': '',
             'findings': [],
@@ -51,7 +188,7 @@ class PageTableAnalyzer:
 
     def _visualize_mappings(self, mappings: List[Dict]) -> str:
         """Create text visualization of page table mappings."""
-        lines = []
+        lines: List[str] = []
         lines.append("Page Table Mappings:")
         lines.append("=" * 80)
 
@@ -64,7 +201,7 @@ class PageTableAnalyzer:
             if arch == 'x86':
                 flags = mapping.get('flags', [])
                 flags_str = ' '.join(flags) if flags else 'none'
-                perm = []
+                perm: List[str] = []
                 if 'W' in flags:
                     perm.append('write')
                 else:
@@ -99,123 +236,64 @@ class PageTableAnalyzer:
 
         return '\n'.join(lines)
 
-    def _check_for_errors(self, mappings: List[Dict], result: Dict):
-        """Check page table mappings for common errors."""
+    def _check_for_errors(self, mappings: List[Dict], result: Dict) -> None:
+        """
+        Check page table mappings for common errors.
+
+        The scan reduces each mapping to its address region and flag bits and
+        looks up the finding codes for that combination (a page table has only a
+        handful of distinct ones, so the classifiers are memoized). Mappings with
+        nothing to report are skipped at once; messages are formatted afterwards,
+        and only for mappings with problems.
+        """
+        hits: List[Tuple[str, int]] = []
+
         for mapping in mappings:
             arch = mapping.get('arch', 'unknown')
-            va = mapping.get('va', 'unknown')
-            pa = mapping.get('pa', 'unknown')
-
-            try:
-                va_int = int(va, 16) if va.startswith('0x') else int(va, 16)
-            except (ValueError, AttributeError):
+            kernel_user_code = _KERNEL_USER_CODES.get(arch)
+            if kernel_user_code is None:
                 continue
 
-            if arch == 'x86':
-                self._check_x86_mapping(mapping, va_int, result)
-            elif arch == 'riscv':
-                self._check_riscv_mapping(mapping, va_int, result)
-
-    def _check_x86_mapping(self, mapping: Dict, va_int: int, result: Dict):
-        """Check x86 page table mapping for errors."""
-        flags = mapping.get('flags', [])
-        present = mapping.get('present', True)
-        writable = mapping.get('writable', False)
-        user = mapping.get('user', False)
-        va = mapping.get('va')
-
-        # Check 1: Kernel space marked as user-accessible
-        if va_int >= 0x80000000 and user:
-            result['findings'].append({
-                'severity': 'critical',
-                'category': 'security_violation',
-                'message': f"CRITICAL: Kernel address {va} is marked as user-accessible (U bit set)!\n"
-                           f"  - This is a serious security vulnerability\n"
-                           f"  - User programs can read/write kernel memory\n"
-                           f"  - Kernel mappings should NOT have the U (user) bit set"
-            })
-
-        # Check 2: Kernel code marked as writable
-        if 0x80100000 <= va_int < 0x80200000 and writable:
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'code_writable',
-                'message': f"WARNING: Kernel code region {va} is marked as writable (W bit set)\n"
-                           f"  - Code should generally be read-only for security\n"
-                           f"  - This can enable code injection attacks\n"
-                           f"  - Consider removing the W bit for executable pages"
-            })
-
-        # Check 3: Page not present
-        if not present:
-            result['findings'].append({
-                'severity': 'info',
-                'category': 'not_present',
-                'message': f"Page at {va} is not present (P bit = 0)\n"
-                           f"  - Accessing this address will trigger a page fault\n"
-                           f"  - This may be intentional (demand paging, copy-on-write)\n"
-                           f"  - Or it may indicate an incomplete page table setup"
-            })
+            va = mapping.get('va', 'unknown')
+            va_int = mapping.get('va_int')
+            if va_int is None:
+                # Mapping not produced by PageTableParser
+                try:
+                    va_int = int(va, 16)
+                except (ValueError, TypeError):
+                    continue
 
-        # Check 4: User space marked as non-user
-        if va_int < 0x80000000 and not user:
-            result['findings'].append({
-                'severity': 'warning',
-                'category': 'user_space_kernel_only',
-                'message': f"User space address {va} is marked as kernel-only (U bit = 0)\n"
-                           f"  - User programs cannot access this address\n"
-                           f"  - This will cause a page fault in user mode\n"
-                           f"  - Make sure this is intentional"
-            })
+            kernel = va_int >= _KERNEL_BASE
+            user = bool(mapping.get('user', False))
 
-    def _check_riscv_mapping(self, mapping: Dict, va_int: int, result: Dict):
-        """Check RISC-V page table mapping for errors."""
-        readable = mapping.get('readable', False)
-        writable = mapping.get('writable', False)
-        executable = mapping.get('executable', False)
-        user = mapping.get('user', False)
-        valid = mapping.get('valid', True)
-        va = mapping.get('va')
-
-        # In RISC-V, kernel space is typically high addresses
-        # Check for kernel space marked as user-accessible
-        if va_int >= 0x80000000 and user:
-            result['findings'].append({
-                'severity': 'critical',
-                'category': 'security_violation',
-                'message': f"CRITICAL: Kernel address {va} is marked as user-accessible (U bit set)!\n"
-                           f"  - This is a serious security vulnerability\n"
-                           f"  - User programs can access kernel memory\n"
-                           f"  - Kernel mappings should NOT have the U bit set"
-            })
+            # Kernel space marked as user-accessible (same test on both architectures)
+            if kernel and user:
+                hits.append((va, kernel_user_code))
 
-        # Check for writable + executable (W+X violation)
-        if writable and executable:
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'wx_violation',
-                'message': f"WARNING: Page {va} is both writable and executable (W+X)\n"
-                           f"  - This violates the W^X security principle\n"
-                           f"  - Pages should be either writable OR executable, not both\n"
-                           f"  - This enables code injection attacks"
-            })
-
-        # Check for invalid page
-        if not valid:
-            result['findings'].append({
-                'severity': 'info',
-                'category': 'invalid_page',
-                'message': f"Page at {va} is not valid (V bit = 0)\n"
-                           f"  - Accessing this address will trigger a page fault\n"
-                           f"  - This may be intentional or indicate incomplete setup"
-            })
+            if arch == 'x86':
+                codes = _x86_finding_codes(
+                    kernel,
+                    0x80100000 <= va_int < 0x80200000,
+                    bool(mapping.get('writable', False)),
+                    user,
+                    bool(mapping.get('present', True)))
+            else:
+                codes = _riscv_finding_codes(
+                    bool(mapping.get('readable', False)),
+                    bool(mapping.get('writable', False)),
+                    bool(mapping.get('executable', False)),
+                    bool(mapping.get('valid', True)))
 
-        # Check for page with no permissions
-        if not readable and not writable and not executable and valid:
-            result['findings'].append({
-                'severity': 'warning',
-                'category': 'no_permissions',
-                'message': f"Page {va} is valid but has no R/W/X permissions\n"
-                           f"  - This is likely a page table directory entry, not a leaf\n"
-                           f"  - Or an error in permission setup"
+            if not codes:
+                continue
+            for code in codes:
+                hits.append((va, code))
+
+        findings = result['findings']
+        for va, code in hits:
+            severity, category, head, tail = _FINDING_PARTS[code]
+            findings.append({
+                'severity': severity,
+                'category': category,
+                'message': head + str(va) + tail
             })
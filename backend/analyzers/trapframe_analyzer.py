@@ -1,19 +1,231 @@
 """Analyzer for trapframe/exception frame dumps."""
 
-from typing import Dict, List
-import sys
-import os
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Sequence
+
+
+@lru_cache(maxsize=2048)
+def _parse_int(value: str) -> int:
+    """
+    Parse a register/field value: hex with a 0x prefix, decimal otherwise.
+
+    Memoized since the same values (trap numbers, cr2=0x0, ...) recur
+    across dumps. Raises ValueError for unparseable input.
+    """
+    return int(value, 16) if value.startswith('0x') else int(value)
+
+
+class TrapframeResult:
+    """
+    Result of a trapframe analysis.
+
+    A slotted record: the handlers set fields as attributes, and the dict
+    form is only built by to_dict() when the result is actually kept.
+    """
+
+    __slots__ = ('exception_info', 'error_code_analysis', 'findings', 'summary')
+
+    def __init__(self, exception_info: Optional[Dict] = None,
+                 error_code_analysis: Optional[Dict] = None,
+                 findings: Optional[Sequence[Dict]] = None, summary: str = ''):
+        self.exception_info = exception_info
+        self.error_code_analysis = error_code_analysis
+        self.findings = [] if findings is None else findings
+        self.summary = summary
+
+    def to_dict(self) -> Dict:
+        """Dict form, as returned by TrapframeAnalyzer.analyze()."""
+        return {
+            'exception_info': self.exception_info,
+            'error_code_analysis': self.error_code_analysis,
+            'findings': self.findings,
+            'summary': self.summary
+        }
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from parsers.trapframe_parser import TrapframeParser
+# Shared result for input without a usable trapframe. Findings is a tuple so
+# accidental mutation fails loudly instead of leaking into later results.
+_EMPTY_RESULT = TrapframeResult(findings=())
+
+# x86 page fault error code bits
+_PF_PRESENT = 0x1   # 0 = not present, 1 = protection violation
+_PF_WRITE = 0x2     # 0 = read, 1 = write
+_PF_USER = 0x4      # 0 = kernel mode, 1 = user mode
+_PF_RESERVED = 0x8  # reserved bit violation
+_PF_IFETCH = 0x10   # instruction fetch
+_PF_ALL_BITS = _PF_PRESENT | _PF_WRITE | _PF_USER | _PF_RESERVED | _PF_IFETCH
+
+# (bit, line when set, line when clear), in description order
+_PF_DESCRIPTIONS = (
+    (_PF_PRESENT, "  - Page is present but access violated permissions (protection fault)",
+     "  - Page is not present (not mapped)"),
+    (_PF_WRITE, "  - Caused by a write operation", "  - Caused by a read operation"),
+    (_PF_USER, "  - Occurred in user mode", "  - Occurred in kernel mode"),
+    (_PF_IFETCH, "  - Caused by instruction fetch", None),
+    (_PF_RESERVED, "  - Reserved bit violation", None),
+)
+
+
+@lru_cache(maxsize=None)
+def _describe_error_code(err_bits: int) -> str:
+    """Description of a page fault error code (at most 32 distinct values)."""
+    lines = [when_set if err_bits & bit else when_clear
+             for bit, when_set, when_clear in _PF_DESCRIPTIONS]
+    return "\n".join(line for line in lines if line is not None)
+
+# Findings with no variable parts; appended as copies so results stay independent
+_GENERAL_PROTECTION_FINDING = {
+    'severity': 'high',
+    'category': 'general_protection',
+    'message': "General Protection Fault detected. This usually indicates:\n"
+               "  - Accessing a segment with invalid permissions\n"
+               "  - Loading a null selector\n"
+               "  - Executing a privileged instruction in user mode\n"
+               "  - Writing to a read-only segment"
+}
+
+_DOUBLE_FAULT_FINDING = {
+    'severity': 'critical',
+    'category': 'double_fault',
+    'message': "Double Fault detected! This is a critical error that occurs when "
+               "the CPU fails to handle an exception (e.g., stack overflow in exception handler). "
+               "Check your interrupt/exception handlers and stack setup."
+}
+
+_ILLEGAL_INSTRUCTION_FINDING = {
+    'severity': 'high',
+    'category': 'illegal_instruction',
+    'message': "Illegal instruction exception. This usually indicates:\n"
+               "  - Executing invalid or corrupted code\n"
+               "  - Jumping to a data region\n"
+               "  - Function pointer corruption"
+}
+
+# Message templates for findings that mention addresses/registers
+_INVALID_OPCODE_MSG = (
+    "Invalid Opcode at EIP={eip}. This usually indicates:\n"
+    "  - Jumping to invalid or corrupted code\n"
+    "  - Executing data as code\n"
+    "  - Function pointer corruption"
+)
+
+_X86_NULL_POINTER_MSG = (
+    "Null pointer dereference detected! Faulting address CR2={cr2} is very close to 0x0.\n"
+    "  - This typically means a null or uninitialized pointer was dereferenced.\n"
+    "  - Check the code at EIP={eip} for pointer dereferences.\n"
+    "  - Look for struct member accesses like `ptr->field` where ptr is NULL."
+)
+
+_USER_KERNEL_ACCESS_MSG = (
+    "User mode attempted to access kernel space! CR2={cr2}\n"
+    "  - User programs cannot access addresses >= 0x80000000\n"
+    "  - This may be due to a bad pointer in user code\n"
+    "  - Or a missing page table mapping"
+)
+
+_KERNEL_PROTECTION_FAULT_MSG = (
+    "Kernel mode protection fault at CR2={cr2}\n"
+    "  - Attempted to {access} a page without proper permissions\n"
+    "  - Check if trying to write to a read-only kernel page\n"
+    "  - Or accessing a user page without proper checks"
+)
+
+_KERNEL_PAGE_NOT_PRESENT_MSG = (
+    "Kernel accessed unmapped memory at CR2={cr2}\n"
+    "  - This may be due to:\n"
+    "    • Invalid pointer passed to kernel (e.g., from syscall)\n"
+    "    • Kernel bug (accessing uninitialized pointer)\n"
+    "    • Stack overflow\n"
+    "  - Fault occurred at EIP={eip}"
+)
+
+_WRITE_TO_READONLY_MSG = (
+    "Attempted to write to a read-only page at CR2={cr2}\n"
+    "  - The page is mapped but not writable\n"
+    "  - Check page table permissions (W bit)\n"
+    "  - Common in copy-on-write implementations"
+)
+
+_RISCV_NULL_POINTER_MSG = (
+    "Null pointer dereference! Faulting address STVAL={stval}\n"
+    "  - Attempted {fault_type} from address near 0x0\n"
+    "  - Check code at SEPC={sepc} for null pointer usage"
+)
+
+_RISCV_PAGE_FAULT_MSG = (
+    "Page fault on {fault_type} at STVAL={stval}\n"
+    "  - Page is not mapped or lacks proper permissions\n"
+    "  - Fault occurred at SEPC={sepc}\n"
+    "  - Check page table setup and permissions"
+)
+
+# Faulting address regions: below the null guard, at/above the user/kernel
+# split, anywhere else
+_NULL_GUARD = 0x1000
+_KERNEL_BASE_32 = 0x80000000
+_REGION_NULL, _REGION_KERNEL, _REGION_OTHER = 0, 1, 2
+
+
+def _page_fault_finding(region: int, err_bits: int):
+    """(severity, category, message template) for a fault region and P/W/U bits, or None."""
+    if region == _REGION_NULL:
+        return ('critical', 'null_pointer', _X86_NULL_POINTER_MSG)
+    if err_bits & _PF_USER and region == _REGION_KERNEL:
+        return ('high', 'user_kernel_access', _USER_KERNEL_ACCESS_MSG)
+    if not err_bits & _PF_USER:
+        if err_bits & _PF_PRESENT:
+            return ('high', 'kernel_protection_fault', _KERNEL_PROTECTION_FAULT_MSG)
+        return ('high', 'kernel_page_not_present', _KERNEL_PAGE_NOT_PRESENT_MSG)
+    if err_bits & _PF_PRESENT and err_bits & _PF_WRITE:
+        return ('high', 'write_to_readonly', _WRITE_TO_READONLY_MSG)
+    return None
+
+
+# Page fault finding per region, indexed by the error code's P/W/U bits
+_PF_FINDING_BITS = _PF_PRESENT | _PF_WRITE | _PF_USER
+_PF_FINDINGS = tuple(
+    tuple(_page_fault_finding(region, bits) for bits in range(_PF_FINDING_BITS + 1))
+    for region in (_REGION_NULL, _REGION_KERNEL, _REGION_OTHER)
+)
+
+_RISCV_FAULT_TYPES = {
+    12: 'instruction fetch',
+    13: 'load (read)',
+    15: 'store (write)'
+}
 
 
 class TrapframeAnalyzer:
     """Analyze trapframe dumps and provide insights."""
 
     def __init__(self):
-        self.parser = TrapframeParser()
+        # Per-trap handlers, looked up directly instead of an if/elif chain
+        self._x86_handlers = {
+            14: self._analyze_page_fault_x86,
+            13: self._emit_general_protection,
+            6: self._emit_invalid_opcode,
+            8: self._emit_double_fault,
+        }
+        self._riscv_handlers = {
+            12: self._analyze_page_fault_riscv,  # Page faults
+            13: self._analyze_page_fault_riscv,
+            15: self._analyze_page_fault_riscv,
+            2: self._emit_illegal_instruction,
+        }
+
+    @cached_property
+    def parser(self):
+        """Trapframe parser, imported and created on first use to keep startup light."""
+        from parsers.trapframe_parser import TrapframeParser
+        return TrapframeParser()
+
+    @cached_property
+    def _trap_desc(self) -> Dict[str, Dict[int, str]]:
+        """Descriptions of the architecturally defined trap/cause numbers, per architecture."""
+        return {
+            arch: {n: self.parser.get_trap_description(n, arch) for n in range(32)}
+            for arch in ('x86_32', 'x86_64', 'riscv')
+        }
 
     def analyze(self, text: str) -> Dict:
         """
@@ -24,257 +236,193 @@ class TrapframeAnalyzer:
         - error_code_analysis
         - findings
         """
-        result = {
-            'exception_info': None,
-            'error_code_analysis': None,
-            'findings': [],
-            'summary': ''
-        }
+        return self.analyze_result(text).to_dict()
+
+    def analyze_result(self, text: str) -> TrapframeResult:
+        """
+        Analyze trapframe dump, returning a TrapframeResult.
 
-        # Parse trapframe
-        trapframe = self.parser.parse_trapframe(text)
+        Input without a trapframe of a known architecture gets a shared,
+        read-only empty result.
+        """
+        # Parse trapframe; the handlers read a few fields each, so only
+        # those are extracted
+        trapframe = self.parser.parse_trapframe_lazy(text)
         if not trapframe:
-            return result
+            return _EMPTY_RESULT
 
         arch = trapframe.get('arch', 'unknown')
-
-        # Analyze exception type
         if arch in ['x86_32', 'x86_64']:
-            self._analyze_x86_trapframe(trapframe, result)
+            analyze_arch = self._analyze_x86_trapframe
         elif arch == 'riscv':
-            self._analyze_riscv_trapframe(trapframe, result)
+            analyze_arch = self._analyze_riscv_trapframe
+        else:
+            return _EMPTY_RESULT
+
+        result = TrapframeResult()
+
+        # Analyze exception type
+        analyze_arch(trapframe, result)
 
         return result
 
-    def _analyze_x86_trapframe(self, tf: Dict, result: Dict):
+    def _describe_trap(self, trap_no: int, arch: str) -> str:
+        """Human-readable trap description, from the precomputed table when possible."""
+        desc = self._trap_desc[arch].get(trap_no)
+        if desc is None:
+            desc = self.parser.get_trap_description(trap_no, arch)
+        return desc
+
+    def _analyze_x86_trapframe(self, tf: Dict, result: TrapframeResult):
         """Analyze x86 trapframe."""
         trap_no_str = tf.get('trap_no')
+        arch = tf['arch']
         if not trap_no_str:
             return
 
         try:
-            trap_no = int(trap_no_str, 16) if trap_no_str.startswith('0x') else int(trap_no_str)
+            trap_no = _parse_int(trap_no_str)
         except ValueError:
             return
 
         # Get trap description
-        trap_desc = self.parser.get_trap_description(trap_no, tf['arch'])
+        trap_desc = self._describe_trap(trap_no, arch)
 
-        result['exception_info'] = {
+        result.exception_info = {
             'trap_number': trap_no,
             'trap_name': trap_desc,
-            'arch': tf['arch']
+            'arch': arch
         }
 
-        # Analyze Page Fault (trap 14)
-        if trap_no == 14:
-            self._analyze_page_fault_x86(tf, result)
-
-        # Analyze General Protection Fault (trap 13)
-        elif trap_no == 13:
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'general_protection',
-                'message': "General Protection Fault detected. This usually indicates:\n"
-                           "  - Accessing a segment with invalid permissions\n"
-                           "  - Loading a null selector\n"
-                           "  - Executing a privileged instruction in user mode\n"
-                           "  - Writing to a read-only segment"
-            })
-
-        # Analyze Invalid Opcode (trap 6)
-        elif trap_no == 6:
-            eip = tf.get('eip', 'unknown')
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'invalid_opcode',
-                'message': f"Invalid Opcode at EIP={eip}. This usually indicates:\n"
-                           f"  - Jumping to invalid or corrupted code\n"
-                           f"  - Executing data as code\n"
-                           f"  - Function pointer corruption"
-            })
-
-        # Analyze Double Fault (trap 8)
-        elif trap_no == 8:
-            result['findings'].append({
-                'severity': 'critical',
-                'category': 'double_fault',
-                'message': "Double Fault detected! This is a critical error that occurs when "
-                           "the CPU fails to handle an exception (e.g., stack overflow in exception handler). "
-                           "Check your interrupt/exception handlers and stack setup."
-            })
+        handler = self._x86_handlers.get(trap_no)
+        if handler:
+            handler(tf, result)
 
         # Generate summary
-        result['summary'] = f"Exception: {trap_desc} (trap #{trap_no})"
-
-    def _analyze_page_fault_x86(self, tf: Dict, result: Dict):
+        result.summary = f"Exception: {trap_desc} (trap #{trap_no})"
+
+    def _emit_general_protection(self, tf: Dict, result: TrapframeResult):
+        """Analyze General Protection Fault (trap 13)."""
+        result.findings.append(dict(_GENERAL_PROTECTION_FINDING))
+
+    def _emit_invalid_opcode(self, tf: Dict, result: TrapframeResult):
+        """Analyze Invalid Opcode (trap 6)."""
+        eip = tf.get('eip', 'unknown')
+        result.findings.append({
+            'severity': 'high',
+            'category': 'invalid_opcode',
+            'message': _INVALID_OPCODE_MSG.format(eip=eip)
+        })
+
+    def _emit_double_fault(self, tf: Dict, result: TrapframeResult):
+        """Analyze Double Fault (trap 8)."""
+        result.findings.append(dict(_DOUBLE_FAULT_FINDING))
+
+    def _analyze_page_fault_x86(self, tf: Dict, result: TrapframeResult):
         """Analyze x86 page fault in detail."""
         cr2 = tf.get('cr2')
         err_code_str = tf.get('err_code')
-        eip = tf.get('eip', tf.get('rip'))
 
-        if not cr2:
+        # Dumps missing either field have nothing to analyze
+        if not (cr2 and err_code_str):
             return
 
         # Parse error code
-        if err_code_str:
-            try:
-                err_code = int(err_code_str, 16) if err_code_str.startswith('0x') else int(err_code_str)
-                err_info = self.parser.decode_x86_page_fault_error_code(err_code)
-
-                result['error_code_analysis'] = {
-                    'raw': hex(err_code),
-                    'present': err_info['present'],
-                    'write': err_info['write'],
-                    'user_mode': err_info['user_mode'],
-                    'reserved': err_info['reserved'],
-                    'instruction_fetch': err_info['instruction_fetch'],
-                    'description': self._format_error_code_description(err_info)
-                }
-
-                # Generate findings based on error code
-                self._generate_page_fault_findings(cr2, err_info, eip, result)
-
-            except ValueError:
-                pass
-
-    def _format_error_code_description(self, err_info: Dict) -> str:
-        """Format page fault error code into human-readable description."""
-        parts = []
-
-        if err_info['present']:
-            parts.append("Page is present but access violated permissions (protection fault)")
-        else:
-            parts.append("Page is not present (not mapped)")
-
-        if err_info['write']:
-            parts.append("Caused by a write operation")
-        else:
-            parts.append("Caused by a read operation")
-
-        if err_info['user_mode']:
-            parts.append("Occurred in user mode")
-        else:
-            parts.append("Occurred in kernel mode")
-
-        if err_info['instruction_fetch']:
-            parts.append("Caused by instruction fetch")
+        try:
+            err_code = _parse_int(err_code_str)
+        except ValueError:
+            return
 
-        if err_info['reserved']:
-            parts.append("Reserved bit violation")
+        # The parser always sets 'eip' for x86; only probe 'rip' without it
+        eip = tf.get('eip')
+        if eip is None and 'eip' not in tf:
+            eip = tf.get('rip')
+
+        result.error_code_analysis = {
+            'raw': hex(err_code),
+            'present': bool(err_code & _PF_PRESENT),
+            'write': bool(err_code & _PF_WRITE),
+            'user_mode': bool(err_code & _PF_USER),
+            'reserved': bool(err_code & _PF_RESERVED),
+            'instruction_fetch': bool(err_code & _PF_IFETCH),
+            'description': _describe_error_code(err_code & _PF_ALL_BITS)
+        }
 
-        return "\n".join(f"  - {part}" for part in parts)
+        # Generate findings based on error code
+        self._generate_page_fault_findings(cr2, err_code, eip, result)
 
-    def _generate_page_fault_findings(self, cr2: str, err_info: Dict, eip: str, result: Dict):
+    def _generate_page_fault_findings(self, cr2: str, err_code: int, eip: str,
+                                      result: TrapframeResult):
         """Generate specific findings based on page fault details."""
         try:
-            cr2_val = int(cr2, 16) if cr2.startswith('0x') else int(cr2)
+            cr2_val = _parse_int(cr2)
         except ValueError:
             cr2_val = 0
 
-        # Check for null pointer dereference
-        if cr2_val < 0x1000:
-            result['findings'].append({
-                'severity': 'critical',
-                'category': 'null_pointer',
-                'message': f"Null pointer dereference detected! Faulting address CR2={cr2} is very close to 0x0.\n"
-                           f"  - This typically means a null or uninitialized pointer was dereferenced.\n"
-                           f"  - Check the code at EIP={eip} for pointer dereferences.\n"
-                           f"  - Look for struct member accesses like `ptr->field` where ptr is NULL."
-            })
+        if cr2_val < _NULL_GUARD:
+            region = _REGION_NULL
+        elif cr2_val >= _KERNEL_BASE_32:
+            region = _REGION_KERNEL
+        else:
+            region = _REGION_OTHER
 
-        # User mode accessing kernel space
-        elif err_info['user_mode'] and cr2_val >= 0x80000000:
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'user_kernel_access',
-                'message': f"User mode attempted to access kernel space! CR2={cr2}\n"
-                           f"  - User programs cannot access addresses >= 0x80000000\n"
-                           f"  - This may be due to a bad pointer in user code\n"
-                           f"  - Or a missing page table mapping"
-            })
+        # Null pointer, user access to kernel space, kernel mode fault or
+        # write to a read-only page, decided by one table lookup
+        finding = _PF_FINDINGS[region][err_code & _PF_FINDING_BITS]
+        if finding is None:
+            return
 
-        # Kernel mode page fault
-        elif not err_info['user_mode']:
-            if err_info['present']:
-                result['findings'].append({
-                    'severity': 'high',
-                    'category': 'kernel_protection_fault',
-                    'message': f"Kernel mode protection fault at CR2={cr2}\n"
-                               f"  - Attempted to {'write' if err_info['write'] else 'read'} a page without proper permissions\n"
-                               f"  - Check if trying to write to a read-only kernel page\n"
-                               f"  - Or accessing a user page without proper checks"
-                })
-            else:
-                result['findings'].append({
-                    'severity': 'high',
-                    'category': 'kernel_page_not_present',
-                    'message': f"Kernel accessed unmapped memory at CR2={cr2}\n"
-                               f"  - This may be due to:\n"
-                               f"    • Invalid pointer passed to kernel (e.g., from syscall)\n"
-                               f"    • Kernel bug (accessing uninitialized pointer)\n"
-                               f"    • Stack overflow\n"
-                               f"  - Fault occurred at EIP={eip}"
-                })
-
-        # Write to read-only page
-        elif err_info['present'] and err_info['write']:
-            result['findings'].append({
-                'severity': 'high',
-                'category': 'write_to_readonly',
-                'message': f"Attempted to write to a read-only page at CR2={cr2}\n"
-                           f"  - The page is mapped but not writable\n"
-                           f"  - Check page table permissions (W bit)\n"
-                           f"  - Common in copy-on-write implementations"
-            })
+        severity, category, template = finding
+        result.findings.append({
+            'severity': severity,
+            'category': category,
+            'message': template.format(
+                cr2=cr2, eip=eip, access='write' if err_code & _PF_WRITE else 'read')
+        })
 
-    def _analyze_riscv_trapframe(self, tf: Dict, result: Dict):
+    def _analyze_riscv_trapframe(self, tf: Dict, result: TrapframeResult):
         """Analyze RISC-V trapframe."""
         scause_str = tf.get('scause')
         if not scause_str:
             return
 
         try:
-            scause = int(scause_str, 16) if scause_str.startswith('0x') else int(scause_str)
+            scause = _parse_int(scause_str)
 
             # Check if it's an interrupt (MSB set) or exception
             is_interrupt = (scause & 0x8000000000000000) != 0
             cause_code = scause & 0x7FFFFFFFFFFFFFFF
 
             if is_interrupt:
-                result['exception_info'] = {
+                result.exception_info = {
                     'type': 'interrupt',
                     'code': cause_code,
                     'description': f'Interrupt {cause_code}'
                 }
             else:
                 # It's an exception
-                exception_desc = self.parser.get_trap_description(cause_code, 'riscv')
-                result['exception_info'] = {
+                exception_desc = self._describe_trap(cause_code, 'riscv')
+                result.exception_info = {
                     'type': 'exception',
                     'code': cause_code,
                     'description': exception_desc
                 }
 
                 # Analyze specific exceptions
-                if cause_code in [12, 13, 15]:  # Page faults
-                    self._analyze_page_fault_riscv(tf, cause_code, result)
-                elif cause_code == 2:  # Illegal instruction
-                    result['findings'].append({
-                        'severity': 'high',
-                        'category': 'illegal_instruction',
-                        'message': "Illegal instruction exception. This usually indicates:\n"
-                                   "  - Executing invalid or corrupted code\n"
-                                   "  - Jumping to a data region\n"
-                                   "  - Function pointer corruption"
-                    })
-
-            result['summary'] = f"Exception: {result['exception_info']['description']}"
+                handler = self._riscv_handlers.get(cause_code)
+                if handler:
+                    handler(tf, cause_code, result)
+
+            result.summary = f"Exception: {result.exception_info['description']}"
 
         except ValueError:
             pass
 
-    def _analyze_page_fault_riscv(self, tf: Dict, cause_code: int, result: Dict):
+    def _emit_illegal_instruction(self, tf: Dict, cause_code: int, result: TrapframeResult):
+        """Analyze RISC-V illegal instruction exception."""
+        result.findings.append(dict(_ILLEGAL_INSTRUCTION_FINDING))
+
+    def _analyze_page_fault_riscv(self, tf: Dict, cause_code: int, result: TrapframeResult):
         """Analyze RISC-V page fault."""
         stval = tf.get('stval')
         sepc = tf.get('sepc')
@@ -283,31 +431,22 @@ class TrapframeAnalyzer:
             return
 
         try:
-            stval_val = int(stval, 16) if stval.startswith('0x') else int(stval)
+            stval_val = _parse_int(stval)
         except ValueError:
             stval_val = 0
 
-        fault_type = {
-            12: 'instruction fetch',
-            13: 'load (read)',
-            15: 'store (write)'
-        }.get(cause_code, 'unknown')
+        fault_type = _RISCV_FAULT_TYPES.get(cause_code, 'unknown')
 
         # Check for null pointer
-        if stval_val < 0x1000:
-            result['findings'].append({
+        if stval_val < _NULL_GUARD:
+            result.findings.append({
                 'severity': 'critical',
                 'category': 'null_pointer',
-                'message': f"Null pointer dereference! Faulting address STVAL={stval}\n"
-                           f"  - Attempted {fault_type} from address near 0x0\n"
-                           f"  - Check code at SEPC={sepc} for null pointer usage"
+                'message': _RISCV_NULL_POINTER_MSG.format(stval=stval, fault_type=fault_type, sepc=sepc)
             })
         else:
-            result['findings'].append({
+            result.findings.append({
                 'severity': 'high',
                 'category': 'page_fault',
-                'message': f"Page fault on {fault_type} at STVAL={stval}\n"
-                           f"  - Page is not mapped or lacks proper permissions\n"
-                           f"  - Fault occurred at SEPC={sepc}\n"
-                           f"  - Check page table setup and permissions"
+                'message': _RISCV_PAGE_FAULT_MSG.format(fault_type=fault_type, stval=stval, sepc=sepc)
             })
@@ -1,43 +1,105 @@
 """Flask web server for OS Debugging Assistant."""
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import (Blueprint, Flask, Response, current_app, request,
+                   send_from_directory, stream_with_context)
 from flask_cors import CORS
-from flask_socketio import SocketIO
+import json
 import os
 import sys
 
+# Optional: orjson encodes large analysis results several times faster than
+# the stdlib json module; fall back to json when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from analyzers.hypothesis_engine import HypothesisEngine
-from gdb.websocket_handler import GDBSessionManager, register_websocket_handlers
-
-app = Flask(__name__, static_folder='../frontend', static_url_path='')
-CORS(app)  # Enable CORS for development
-
-# Initialize SocketIO with CORS support
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
 # Check if AI enhancement should be enabled
 ENABLE_AI = os.environ.get('ENABLE_AI', 'false').lower() == 'true'
 
-# Initialize the hypothesis engine
-engine = HypothesisEngine(enable_ai=ENABLE_AI)
+# Real-time GDB integration (SocketIO) can be turned off for analysis-only
+# deployments, which then never import flask_socketio or the GDB bridge
+ENABLE_GDB = os.environ.get('ENABLE_GDB', 'true').lower() == 'true'
+
+api = Blueprint('api', __name__)
+
+
+def create_app(enable_socketio=False, enable_ai=False):
+    """
+    Create the Flask application.
+
+    Args:
+        enable_socketio: Attach SocketIO and the real-time GDB handlers
+        enable_ai: Enable AI enhancement in the hypothesis engine
+
+    Returns:
+        The configured Flask app. When SocketIO is enabled, the SocketIO
+        instance is available as app.extensions['socketio'].
+    """
+    app = Flask(__name__, static_folder='../frontend', static_url_path='')
+    CORS(app)  # Enable CORS for development
+
+    app.extensions['hypothesis_engine'] = HypothesisEngine(enable_ai=enable_ai)
+    app.register_blueprint(api)
+
+    if enable_socketio:
+        from flask_socketio import SocketIO
+        from gdb.websocket_handler import GDBSessionManager, register_websocket_handlers
 
-# Initialize GDB session manager
-gdb_session_manager = GDBSessionManager(socketio)
+        # Initialize SocketIO with CORS support. Threading mode avoids
+        # monkey-patching the stdlib, which slows the CPU-bound analysis
+        # path; serve with e.g. `gunicorn -k gthread -w 1 --threads 16 app:app`
+        # (one worker, since GDB sessions live in process memory)
+        socketio_options = {'json': _OrjsonModule} if orjson is not None else {}
+        socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading',
+                            **socketio_options)
 
-# Register WebSocket handlers
-register_websocket_handlers(socketio, gdb_session_manager)
+        # Initialize GDB session manager and register WebSocket handlers
+        gdb_session_manager = GDBSessionManager(socketio)
+        register_websocket_handlers(socketio, gdb_session_manager)
+        app.extensions['gdb_session_manager'] = gdb_session_manager
 
+    return app
 
-@app.route('/')
+
+class _OrjsonModule:
+    """
+    json-module stand-in for SocketIO packet encoding, backed by orjson.
+
+    SocketIO expects dumps() to return str (orjson returns bytes) and may
+    pass stdlib-only keyword arguments; payloads orjson rejects fall back
+    to the json module.
+    """
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            return json.dumps(obj, *args, **kwargs)
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+
+def _engine():
+    """Return the hypothesis engine of the current app."""
+    return current_app.extensions['hypothesis_engine']
+
+
+@api.route('/')
 def index():
     """Serve the main HTML page."""
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_from_directory(current_app.static_folder, 'index.html')
 
 
-@app.route('/api/analyze', methods=['POST'])
+@api.route('/api/analyze', methods=['POST'])
 def analyze():
     """
     Main analysis endpoint.
@@ -48,41 +110,115 @@ def analyze():
     try:
         data = request.get_json()
         if not data or 'text' not in data:
-            return jsonify({'error': 'Missing "text" field in request'}), 400
+            return _static_response(_MISSING_TEXT_BODY, 400)
 
         text = data['text']
         if not text or not text.strip():
-            return jsonify({'error': 'Empty input text'}), 400
+            return _static_response(_EMPTY_TEXT_BODY, 400)
 
         # Run the analysis
-        result = engine.analyze(text)
-
-        # Format response
-        response = {
-            'success': True,
-            'summary': result.get('summary', ''),
-            'hypotheses': result.get('hypotheses', []),
-            'gdb_analysis': result.get('gdb_analysis'),
-            'trapframe_analysis': result.get('trapframe_analysis'),
-            'pagetable_analysis': result.get('pagetable_analysis'),
-            'all_findings': result.get('all_findings', []),
-            'ai_insights': result.get('ai_insights'),  # AI 增强的见解
-            'ai_enabled': result.get('ai_enabled', False)
-        }
-
-        return jsonify(response)
+        result = _engine().analyze(text)
+
+        return _json_response(_format_result(result))
 
     except Exception as e:
-        return jsonify({
+        return _json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+
+@api.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Streaming analysis endpoint (Server-Sent Events).
+
+    Expects JSON: {"text": "...debugging output..."}
+    Emits an `analysis` event with the rule-based results right away,
+    then `ai_token` events as the AI insights are generated, then `done`.
+    """
+    data = request.get_json()
+    if not data or 'text' not in data:
+        return _static_response(_MISSING_TEXT_BODY, 400)
+
+    text = data['text']
+    if not text or not text.strip():
+        return _static_response(_EMPTY_TEXT_BODY, 400)
+
+    engine = _engine()
+
+    def generate():
+        try:
+            result = engine.analyze(text, use_ai=False)
+            yield _sse('analysis', _format_result(result))
+
+            if engine.ai_agent:
+                for chunk in engine.ai_agent.enhance_analysis_stream(result, text):
+                    yield _sse('ai_token', {'text': chunk})
+
+            yield _sse('done', {'success': True})
+
+        except Exception as e:
+            yield _sse('error', {'success': False, 'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
-@app.route('/api/health', methods=['GET'])
+def _format_result(result):
+    """Format an engine result as the API response body."""
+    return {
+        'success': True,
+        'summary': result.get('summary', ''),
+        'hypotheses': result.get('hypotheses', []),
+        'gdb_analysis': result.get('gdb_analysis'),
+        'trapframe_analysis': result.get('trapframe_analysis'),
+        'pagetable_analysis': result.get('pagetable_analysis'),
+        'all_findings': result.get('all_findings', []),
+        'ai_insights': result.get('ai_insights'),  # AI 增强的见解
+        'ai_enabled': result.get('ai_enabled', False)
+    }
+
+
+def _json_response(obj, status=200):
+    """Serialize obj as a JSON response, with orjson when available."""
+    if orjson is not None:
+        try:
+            body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+            return current_app.response_class(body, status=status, mimetype='application/json')
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder handles them
+            pass
+    body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def _static_response(body, status=200):
+    """Wrap a pre-encoded JSON body in a fresh response."""
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def _sse(event, data):
+    """Serialize one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# Bodies that never change are encoded once: validation errors and the
+# health probe, which is hit constantly
+_MISSING_TEXT_BODY = b'{"error":"Missing \\"text\\" field in request"}'
+_EMPTY_TEXT_BODY = b'{"error":"Empty input text"}'
+_HEALTH_BODY = b'{"status":"ok"}\n'
+
+
+@api.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({'status': 'ok'})
+    response = _static_response(_HEALTH_BODY)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+app = create_app(enable_socketio=ENABLE_GDB, enable_ai=ENABLE_AI)
 
 
 if __name__ == '__main__':
@@ -91,9 +227,19 @@ if __name__ == '__main__':
 
     print(f"Starting OS Debugging Assistant on port {port}")
     print(f"Debug mode: {debug}")
+    engine = app.extensions['hypothesis_engine']
+    socketio = app.extensions.get('socketio')
     print(f"AI Enhancement: {'Enabled ✓' if ENABLE_AI and engine.ai_agent else 'Disabled'}")
-    print(f"Real-time GDB Integration: Enabled ✓")
+    print(f"Real-time GDB Integration: {'Enabled ✓' if socketio else 'Disabled'}")
     print(f"Access the application at: http://localhost:{port}")
 
-    # Use socketio.run() instead of app.run() for WebSocket support
-    socketio.run(app, host='0.0.0.0', port=port, debug=debug)
+    if socketio:
+        # Use socketio.run() instead of app.run() for WebSocket support.
+        # In threading mode this is Werkzeug's dev server, which
+        # flask-socketio refuses to start without a TTY (nohup, systemd,
+        # docker) unless explicitly allowed; this entry point is for local
+        # use, deployments go through gunicorn -k gthread (see create_app)
+        socketio.run(app, host='0.0.0.0', port=port, debug=debug,
+                     allow_unsafe_werkzeug=True)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug)
@@ -6,13 +6,67 @@ GDB Bridge - GDB 连接和命令执行模块
 
 import os
 import time
+import base64
+import select
 import logging
-from typing import Dict, List, Optional, Any
+import itertools
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple
 from pygdbmi.gdbcontroller import GdbController
 
 logger = logging.getLogger(__name__)
 
 
+# 连接远程目标前的设置：
+# - noack-packet: 协商 QStartNoAckMode，省去每个数据包的 +/- 确认往返
+#   （gdbserver 和 QEMU gdbstub 均支持）
+# - tcp auto-retry off: 目标未就绪时立即报错，而不是反复重试
+# GDB 自身已对远程 TCP 连接设置 TCP_NODELAY，无需额外处理
+_REMOTE_SETTINGS = (
+    'remote noack-packet on',
+    'tcp auto-retry off',
+)
+
+# 常用的无参数 MI 命令，多处共用同一份定义
+_MI_STACK_LIST_FRAMES = '-stack-list-frames'
+_MI_REGISTER_VALUES = '-data-list-register-values x'
+_MI_REGISTER_NAMES = '-data-list-register-names'
+_MI_EXEC_CONTINUE = '-exec-continue'
+_MI_EXEC_NEXT = '-exec-next'
+_MI_EXEC_STEP = '-exec-step'
+
+def _cli_to_mi(command: str) -> str:
+    """把 CLI 命令包装成 MI 的 -interpreter-exec 命令"""
+    return f'-interpreter-exec console "{command}"'
+
+
+# 批量执行 CLI 命令时插在各命令输出之间的分隔行
+_CLI_BATCH_SENTINEL = '---GDBBRIDGE-END---'
+
+
+# 内存读取的对齐粒度
+_MEMORY_PAGE_SIZE = 4096
+
+
+def _memory_result(address: str, data: bytes) -> Dict[str, Any]:
+    """构造内存读取结果；内容以 base64 编码，比十六进制字符串小三分之一"""
+    return {
+        'success': True,
+        'address': address,
+        'encoding': 'base64',
+        'contents': base64.b64encode(data).decode('ascii')
+    }
+
+
+def _parse_address(address: str) -> Optional[int]:
+    """解析数值地址（0x 十六进制或十进制），表达式返回 None"""
+    try:
+        return int(address, 0)
+    except (TypeError, ValueError):
+        return None
+
+
 class GDBBridge:
     """
     GDB 连接桥接器
@@ -32,6 +86,21 @@ class GDBBridge:
         self.connected = False
         self.target_attached = False
 
+        # MI 命令令牌：每条命令带递增的整数前缀，用于匹配对应的结果记录
+        self._tokens = itertools.count(1)
+        # 命令路径与监控线程共用同一个 GDB 输出管道，读取时需加锁
+        self._io_lock = threading.Lock()
+        # 命令执行期间读到的异步通知，留给 GDBMonitor 处理；
+        # 未在监控时直接丢弃，避免堆积并在监控启动后作为过期事件重放
+        self._async_records: deque = deque()
+        # 有暂存的异步通知时调用，用于唤醒监控线程
+        self.on_async_records: Optional[Callable[[], None]] = None
+        # 寄存器编号到名称的映射，对同一目标不变，首次查询时获取
+        self._register_names: Optional[List[str]] = None
+        # 程序每次运行/停止时递增；调用栈、寄存器和内存读取结果在两次变化之间缓存
+        self._stop_epoch = 0
+        self._state_cache: Dict[str, Any] = {}
+
     def start(self, gdb_args: List[str] = None) -> bool:
         """
         启动新的 GDB 进程
@@ -81,7 +150,9 @@ class GDBBridge:
         try:
             # 判断目标类型
             if ':' in target:
-                # 远程目标
+                # 远程目标：先调整远程协议设置（no-ack 模式在建立连接时协商）
+                for setting in _REMOTE_SETTINGS:
+                    self.execute_mi_command(f'-gdb-set {setting}')
                 cmd = f'-target-select remote {target}'
                 logger.info(f"Connecting to remote target: {target}")
             elif os.path.exists(target):
@@ -95,6 +166,9 @@ class GDBBridge:
 
             if self._is_success_response(response):
                 self.target_attached = True
+                # 新目标/符号文件：旧的寄存器名和调用栈/寄存器/内存缓存都不再有效
+                self.invalidate_register_names()
+                self.invalidate_state_cache()
                 return {'success': True, 'message': 'Connected to target'}
             else:
                 error_msg = self._extract_error(response)
@@ -115,23 +189,154 @@ class GDBBridge:
         Returns:
             list: MI 响应列表
         """
+        return self.execute_mi_commands([command], timeout)[0]
+
+    def execute_mi_commands(self, commands: List[str], timeout: float = 5.0) -> List[List[Dict]]:
+        """
+        连续执行多条 GDB/MI 命令
+
+        所有命令先依次写出，再统一读取结果，总耗时约为一次往返而不是 N 次
+
+        Args:
+            commands: MI 命令列表
+            timeout: 等待全部结果的超时时间（秒）
+
+        Returns:
+            list: 与 commands 一一对应的 MI 响应列表
+        """
         if not self.gdb_controller:
-            return [{'type': 'error', 'message': 'GDB not started'}]
+            return [[{'type': 'error', 'message': 'GDB not started'}] for _ in commands]
 
         try:
-            logger.debug(f"Executing MI command: {command}")
-            responses = self.gdb_controller.write(
-                command,
-                timeout_sec=timeout,
-                raise_error_on_timeout=False
-            )
+            logger.debug(f"Executing MI commands: {commands}")
+            with self._io_lock:
+                tokens = [next(self._tokens) for _ in commands]
+                for token, command in zip(tokens, commands):
+                    self.gdb_controller.write(f'{token}{command}', read_response=False)
+                by_token = self._read_until_results(tokens, timeout)
+
+            if self._async_records and self.on_async_records:
+                self.on_async_records()
 
-            logger.debug(f"Received {len(responses)} responses")
-            return responses
+            logger.debug(f"Received {sum(map(len, by_token.values()))} responses")
+            return [by_token[token] for token in tokens]
 
         except Exception as e:
             logger.error(f"Command execution failed: {e}")
-            return [{'type': 'error', 'message': str(e)}]
+            return [[{'type': 'error', 'message': str(e)}] for _ in commands]
+
+    def _read_until_results(self, tokens: List[int], timeout: float) -> Dict[int, List[Dict]]:
+        """
+        读取输出直到每个令牌的结果记录（^done/^error/^running 等）都已出现
+
+        不再等待 pygdbmi 的“额外输出”检查窗口，结果记录一到即返回；
+        超时则返回已收到的响应。令牌不属于本次调用的结果记录（之前超时
+        命令迟到的结果）直接丢弃。GDB 按顺序执行命令，结果记录之前的其他
+        记录（如控制台输出）归属于下一条尚未完成的命令。调用方需持有 _io_lock。
+        """
+        deadline = time.monotonic() + timeout
+        by_token: Dict[int, List[Dict]] = {token: [] for token in tokens}
+        pending = deque(tokens)
+
+        while True:
+            batch = self.gdb_controller.get_gdb_response(
+                timeout_sec=0,
+                raise_error_on_timeout=False
+            )
+            for resp in batch:
+                resp_type = resp.get('type')
+                if resp_type == 'notify':
+                    if self.on_async_records is not None:
+                        self._async_records.append(resp)
+                    self._track_execution_state(resp)
+                elif resp_type == 'result':
+                    self._track_execution_state(resp)
+                    token = resp.get('token')
+                    if token not in by_token:
+                        # 之前超时命令迟到的结果，不能当作本次命令的结果
+                        logger.warning(f"Discarding stale MI result for token {token}: {resp.get('message')}")
+                        continue
+                    by_token[token].append(resp)
+                    if token in pending:
+                        pending.remove(token)
+                    continue
+                by_token[pending[0] if pending else tokens[-1]].append(resp)
+
+            if not pending:
+                return by_token
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Timed out waiting for result of MI commands {list(pending)}")
+                return by_token
+
+            self._wait_readable(remaining)
+
+    def _wait_readable(self, timeout: float):
+        """等待 GDB 标准输出可读（最多 timeout 秒）"""
+        try:
+            select.select([self.gdb_controller.gdb_process.stdout], [], [], timeout)
+        except (OSError, ValueError):
+            # 管道不支持 select（如 Windows）时退化为短暂休眠
+            time.sleep(min(timeout, 0.01))
+
+    def output_pipe(self):
+        """GDB 标准输出管道（可用于 select），GDB 未运行时返回 None"""
+        if self.gdb_controller and self.gdb_controller.gdb_process.poll() is None:
+            return self.gdb_controller.gdb_process.stdout
+        return None
+
+    def read_async_responses(self, timeout_sec: float = 0) -> List[Dict]:
+        """
+        读取异步输出（供 GDBMonitor 使用）
+
+        先返回命令执行期间暂存的异步通知；否则等待新输出并在锁内读取，
+        避免与 execute_mi_command 争抢同一管道。
+
+        Args:
+            timeout_sec: 无输出时的最长等待时间（默认不等待，由调用方用
+                         output_pipe() 等待可读）
+
+        Returns:
+            list: MI 响应列表
+        """
+        if not self.gdb_controller:
+            return []
+
+        if not self._async_records:
+            self._wait_readable(timeout_sec)
+
+        with self._io_lock:
+            responses = list(self._async_records)
+            self._async_records.clear()
+            if self.gdb_controller:
+                batch = self.gdb_controller.get_gdb_response(
+                    timeout_sec=0,
+                    raise_error_on_timeout=False
+                )
+                for resp in batch:
+                    self._track_execution_state(resp)
+                responses.extend(batch)
+        return responses
+
+    def _track_execution_state(self, resp: Dict):
+        """程序开始运行或停止（^running / *running / *stopped）时使状态缓存失效"""
+        if resp.get('message') in ('running', 'stopped'):
+            self.invalidate_state_cache()
+
+    def invalidate_state_cache(self):
+        """
+        清除调用栈/寄存器/内存缓存
+
+        程序状态变化时自动调用；执行了可能修改状态的任意命令后也应调用。
+        """
+        self._stop_epoch += 1
+        self._state_cache = {}
+
+    def _cache_state(self, epoch: int, key: str, value: Any):
+        """缓存读取结果，读取期间状态已变化则丢弃"""
+        if epoch == self._stop_epoch:
+            self._state_cache[key] = value
 
     def execute_cli_command(self, command: str) -> Dict[str, Any]:
         """
@@ -144,21 +349,58 @@ class GDBBridge:
             dict: 解析后的结果
         """
         # 使用 MI 命令执行 CLI 命令
-        mi_cmd = f'-interpreter-exec console "{command}"'
-        responses = self.execute_mi_command(mi_cmd)
+        responses = self.execute_mi_command(_cli_to_mi(command))
+        return self._cli_result(command, responses)
+
+    def execute_cli_batch(self, commands: List[str]) -> Dict[str, Any]:
+        """
+        在一条 -interpreter-exec 中依次执行多条 CLI 命令
+
+        -interpreter-exec 会逐个执行其后的每个参数，命令之间插入 echo 分隔行，
+        再按分隔行切分输出；某条命令出错时 GDB 不再执行后续命令
 
-        # 提取输出
-        output_lines = []
+        Args:
+            commands: CLI 命令列表
+
+        Returns:
+            dict: outputs 为每条已执行命令的输出，output 为全部输出
+        """
+        args = []
+        for command in commands:
+            args.append(f'"{command}"')
+            args.append(f'"echo {_CLI_BATCH_SENTINEL}\\n"')
+        responses = self.execute_mi_command('-interpreter-exec console ' + ' '.join(args))
+
+        output = ''.join(resp.get('payload') or '' for resp in responses
+                         if resp.get('type') == 'console')
+        outputs = output.split(_CLI_BATCH_SENTINEL + '\n')
+        remainder = outputs.pop()
+
+        result = {
+            'success': True,
+            'command': '\n'.join(commands),
+            'outputs': outputs,
+            'output': ''.join(outputs) + remainder
+        }
         for resp in responses:
-            if resp.get('type') == 'console':
-                payload = resp.get('payload', '')
-                # 去除转义字符
-                output_lines.append(payload.strip('"').replace('\\n', '\n'))
+            if resp.get('type') == 'result' and resp.get('message') == 'error':
+                # 出错命令的输出没有分隔行，归入它自己的一项
+                outputs.append(remainder)
+                result['success'] = False
+                result['error'] = (resp.get('payload') or {}).get('msg', '')
+                break
+        return result
+
+    def _cli_result(self, command: str, responses: List[Dict]) -> Dict[str, Any]:
+        """从 CLI 命令的响应中提取输出"""
+        # pygdbmi 已对控制台流记录去掉引号并反转义
+        output = ''.join(resp.get('payload') or '' for resp in responses
+                         if resp.get('type') == 'console')
 
         return {
             'success': True,
             'command': command,
-            'output': ''.join(output_lines)
+            'output': output
         }
 
     def get_backtrace(self) -> Dict[str, Any]:
@@ -168,16 +410,74 @@ class GDBBridge:
         Returns:
             dict: 包含 frames 列表的结果
         """
-        responses = self.execute_mi_command('-stack-list-frames')
+        cached = self._state_cache.get('backtrace')
+        if cached is not None:
+            return dict(cached)
 
+        epoch = self._stop_epoch
+        responses = self.execute_mi_command(_MI_STACK_LIST_FRAMES)
+        return self._backtrace_result(responses, epoch)
+
+    def iter_backtrace(self, chunk: int = 64) -> Iterator[List[Dict]]:
+        """
+        分段获取调用栈，每段最多 chunk 帧
+
+        用 -stack-list-frames low high 逐段查询，调用栈很深时第一段
+        即可先发给前端；完整读完后与 get_backtrace 共用缓存
+
+        Args:
+            chunk: 每段的帧数
+
+        Yields:
+            list: 一段栈帧
+        """
+        chunk = max(chunk, 1)
+        cached = self._state_cache.get('backtrace')
+        if cached is not None:
+            frames = cached['frames']
+            for i in range(0, len(frames), chunk):
+                yield frames[i:i + chunk]
+            return
+
+        epoch = self._stop_epoch
+        frames: List[Dict] = []
+        low = 0
+        while True:
+            responses = self.execute_mi_command(f'{_MI_STACK_LIST_FRAMES} {low} {low + chunk - 1}')
+            part = None
+            for resp in responses:
+                if resp.get('message') == 'done':
+                    part = resp.get('payload', {}).get('stack', [])
+                    break
+
+            if part is None:
+                # 栈深恰好是 chunk 的整数倍时，越界查询会返回错误
+                complete = low > 0
+                break
+
+            frames.extend(part)
+            if part:
+                yield part
+            if len(part) < chunk:
+                complete = True
+                break
+            low += chunk
+
+        if complete:
+            self._cache_state(epoch, 'backtrace', {'success': True, 'frames': frames})
+
+    def _backtrace_result(self, responses: List[Dict], epoch: int) -> Dict[str, Any]:
+        """解析 -stack-list-frames 的响应并缓存"""
         for resp in responses:
             if resp.get('message') == 'done':
                 payload = resp.get('payload', {})
                 frames = payload.get('stack', [])
-                return {
+                result = {
                     'success': True,
                     'frames': frames
                 }
+                self._cache_state(epoch, 'backtrace', result)
+                return dict(result)
 
         return {'success': False, 'frames': []}
 
@@ -188,56 +488,226 @@ class GDBBridge:
         Returns:
             dict: 寄存器名到值的映射
         """
+        cached = self._state_cache.get('registers')
+        if cached is not None:
+            return {'success': True, 'registers': dict(cached)}
+
         # 获取所有寄存器的值（十六进制格式）
-        responses = self.execute_mi_command('-data-list-register-values x')
+        epoch = self._stop_epoch
+        responses = self.execute_mi_command(_MI_REGISTER_VALUES)
+        return self._registers_result(responses, epoch)
 
+    def _registers_result(self, responses: List[Dict], epoch: int) -> Dict[str, Any]:
+        """解析 -data-list-register-values 的响应并缓存"""
         registers = {}
         for resp in responses:
             if resp.get('message') == 'done':
                 payload = resp.get('payload', {})
                 register_values = payload.get('register-values', [])
 
+                # 寄存器名称按编号索引，一次取全并缓存
+                names = self._get_register_names()
                 for reg in register_values:
-                    number = reg.get('number')
-                    value = reg.get('value')
-                    # 获取寄存器名称
-                    name_resp = self.execute_mi_command(f'-data-list-register-names {number}')
-                    for nr in name_resp:
-                        if nr.get('message') == 'done':
-                            names = nr.get('payload', {}).get('register-names', [])
-                            if names:
-                                registers[names[0]] = value
-
-                return {'success': True, 'registers': registers}
+                    number = int(reg.get('number'))
+                    if number < len(names):
+                        registers[names[number]] = reg.get('value')
+
+                self._cache_state(epoch, 'registers', registers)
+                return {'success': True, 'registers': dict(registers)}
 
         return {'success': False, 'registers': {}}
 
-    def read_memory(self, address: str, size: int = 256) -> Dict[str, Any]:
+    def _get_register_names(self) -> List[str]:
+        """获取全部寄存器名称（按编号索引），结果缓存到目标变化为止"""
+        if self._register_names is None:
+            self._store_register_names(self.execute_mi_command(_MI_REGISTER_NAMES))
+        return self._register_names or []
+
+    def _store_register_names(self, responses: List[Dict]):
+        """从 -data-list-register-names 的响应中缓存寄存器名称"""
+        for resp in responses:
+            if resp.get('message') == 'done':
+                self._register_names = resp.get('payload', {}).get('register-names', [])
+                return
+
+    def capture_state(self, frame_info: bool = False) -> Dict[str, Any]:
+        """
+        获取程序停止时的调用栈、寄存器（以及可选的当前帧信息）
+
+        所需的 MI 命令连续写出、统一读取，只需一次往返；已缓存的部分不再查询
+
+        Args:
+            frame_info: 是否同时给出当前帧（第 0 帧）信息
+
+        Returns:
+            dict: 成功获取的 backtrace / registers / frame_info
+        """
+        epoch = self._stop_epoch
+        state: Dict[str, Any] = {}
+        commands: Dict[str, str] = {}
+
+        cached_bt = self._state_cache.get('backtrace')
+        if cached_bt is not None:
+            state['backtrace'] = cached_bt['frames']
+        else:
+            commands['backtrace'] = _MI_STACK_LIST_FRAMES
+
+        cached_regs = self._state_cache.get('registers')
+        if cached_regs is not None:
+            state['registers'] = dict(cached_regs)
+        else:
+            commands['registers'] = _MI_REGISTER_VALUES
+            if self._register_names is None:
+                commands['register_names'] = _MI_REGISTER_NAMES
+
+        if not commands:
+            return self._with_frame_info(state, frame_info)
+
+        results = dict(zip(commands, self.execute_mi_commands(list(commands.values()))))
+
+        if 'register_names' in results:
+            self._store_register_names(results['register_names'])
+
+        if 'backtrace' in results:
+            bt_result = self._backtrace_result(results['backtrace'], epoch)
+            if bt_result.get('success'):
+                state['backtrace'] = bt_result.get('frames', [])
+
+        if 'registers' in results:
+            reg_result = self._registers_result(results['registers'], epoch)
+            if reg_result.get('success'):
+                state['registers'] = reg_result.get('registers', {})
+
+        return self._with_frame_info(state, frame_info)
+
+    @staticmethod
+    def _with_frame_info(state: Dict[str, Any], frame_info: bool) -> Dict[str, Any]:
+        """当前帧信息直接取调用栈第 0 帧，与 -stack-info-frame 的结果相同，无需再查询"""
+        if frame_info and state.get('backtrace'):
+            state['frame_info'] = dict(state['backtrace'][0])
+        return state
+
+    def invalidate_register_names(self):
+        """目标或其符号文件变化时清除寄存器名称缓存"""
+        self._register_names = None
+
+    def read_memory(self, address: str, size: int = 256, prefetch: bool = False) -> Dict[str, Any]:
         """
         读取内存
 
         Args:
             address: 内存地址（如 0x80000000）
             size: 读取字节数
+            prefetch: 是否按整页预读并缓存（仅用于普通 RAM，MMIO 区域不要开启）
 
         Returns:
-            dict: 内存内容
+            dict: success / address / encoding / contents（base64 编码的内存内容）
         """
-        cmd = f'-data-read-memory-bytes {address} {size}'
-        responses = self.execute_mi_command(cmd)
+        found = self._read_memory_data(address, size, prefetch)
+        if found is None:
+            return {'success': False, 'encoding': 'base64', 'contents': ''}
+        return _memory_result(*found)
+
+    def _read_memory_data(self, address: str, size: int,
+                          prefetch: bool = False) -> Optional[Tuple[str, bytes]]:
+        """读取内存，返回 (起始地址, bytes)，失败返回 None"""
+        cached = self._lookup_memory(address, size)
+        if cached is not None:
+            return cached
+
+        epoch = self._stop_epoch
+
+        # 调用方显式开启时数值地址按整页读取：多读几 KB 的代价远小于一次往返，
+        # 之后滚动查看附近内存时直接命中缓存。默认只读请求的范围，
+        # 避免读到 MMIO 寄存器时产生副作用
+        start = _parse_address(address) if prefetch else None
+        if start is not None and isinstance(size, int) and size > 0:
+            base = start & ~(_MEMORY_PAGE_SIZE - 1)
+            span = -(-(start + size - base) // _MEMORY_PAGE_SIZE) * _MEMORY_PAGE_SIZE
+            block = self._read_memory_block(hex(base), span)
+            if block is not None and self._store_memory(epoch, hex(base), span, block):
+                cached = self._lookup_memory(address, size)
+                if cached is not None:
+                    return cached
+
+        # 整页读取失败（如跨越未映射区域）时只读请求的范围
+        block = self._read_memory_block(address, size)
+        if block is not None:
+            self._store_memory(epoch, address, size, block)
+            try:
+                return block.get('begin'), bytes.fromhex(block.get('contents', ''))
+            except ValueError:
+                return None
+
+        return None
+
+    def _read_memory_block(self, address: str, size: int) -> Optional[Dict[str, Any]]:
+        """执行 -data-read-memory-bytes，返回第一个内存块，失败返回 None"""
+        responses = self.execute_mi_command(f'-data-read-memory-bytes {address} {size}')
 
         for resp in responses:
             if resp.get('message') == 'done':
-                payload = resp.get('payload', {})
-                memory = payload.get('memory', [])
+                memory = resp.get('payload', {}).get('memory', [])
                 if memory:
-                    return {
-                        'success': True,
-                        'address': memory[0].get('begin'),
-                        'contents': memory[0].get('contents')
-                    }
+                    return memory[0]
+        return None
+
+    def iter_memory(self, address: str, size: int = 256, chunk: int = _MEMORY_PAGE_SIZE,
+                    prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        读取内存并分段产出，每段最多 chunk 字节，prefetch 含义同 read_memory
+
+        Yields:
+            dict: 与 read_memory 相同，contents 为本段内容
+        """
+        found = self._read_memory_data(address, size, prefetch)
+        if found is None:
+            yield {'success': False, 'encoding': 'base64', 'contents': ''}
+            return
+
+        begin, data = found
+        base = int(begin or '0x0', 16)
+        width = max(len(begin or '') - 2, 1)
+        view = memoryview(data)
+        for offset in range(0, len(data), chunk):
+            yield _memory_result(f'0x{base + offset:0{width}x}', view[offset:offset + chunk])
+
+    def _lookup_memory(self, address: str, size: int) -> Optional[Tuple[str, bytes]]:
+        """从本次停止后读过的内存块中取出 [address, address+size)，返回 (起始地址, bytes)，未命中返回 None"""
+        if not isinstance(size, int):
+            return None
+
+        start = _parse_address(address)
+        if start is None:
+            # 表达式地址（如 $sp）只能按原文精确命中
+            return self._state_cache.get('memory_expr', {}).get((address, size))
+
+        end = start + size
+        for begin, data, width in self._state_cache.get('memory', ()):
+            if begin <= start and end <= begin + len(data):
+                offset = start - begin
+                return f'0x{start:0{width}x}', data[offset:offset + size]
+        return None
+
+    def _store_memory(self, epoch: int, address: str, size: int, block: Dict[str, Any]) -> bool:
+        """缓存一次完整读取的内存块；只读到部分内容或状态已变化时不缓存，返回 False"""
+        if epoch != self._stop_epoch:
+            return False
+        try:
+            begin_str = block.get('begin', '')
+            begin = int(begin_str, 16)
+            data = bytes.fromhex(block.get('contents', ''))
+        except ValueError:
+            return False
+        if len(data) != size:
+            return False
 
-        return {'success': False, 'contents': ''}
+        if _parse_address(address) is None:
+            self._state_cache.setdefault('memory_expr', {})[(address, size)] = (begin_str, data)
+        else:
+            width = max(len(begin_str) - 2, 1)
+            self._state_cache.setdefault('memory', []).append((begin, data, width))
+        return True
 
     def set_breakpoint(self, location: str) -> Dict[str, Any]:
         """
@@ -267,25 +737,33 @@ class GDBBridge:
 
     def continue_execution(self) -> Dict[str, Any]:
         """继续执行程序"""
-        responses = self.execute_mi_command('-exec-continue')
+        responses = self.execute_mi_command(_MI_EXEC_CONTINUE)
         return {'success': True, 'responses': responses}
 
     def step_over(self) -> Dict[str, Any]:
         """单步执行（跳过函数）"""
-        responses = self.execute_mi_command('-exec-next')
+        responses = self.execute_mi_command(_MI_EXEC_NEXT)
         return {'success': True, 'responses': responses}
 
     def step_into(self) -> Dict[str, Any]:
         """单步执行（进入函数）"""
-        responses = self.execute_mi_command('-exec-step')
+        responses = self.execute_mi_command(_MI_EXEC_STEP)
         return {'success': True, 'responses': responses}
 
+    def discard_async_records(self):
+        """丢弃尚未被监控处理的异步通知（监控停止时调用）"""
+        self._async_records.clear()
+
     def stop(self):
         """停止 GDB 进程"""
         if self.gdb_controller:
             logger.info("Stopping GDB")
-            self.gdb_controller.exit()
-            self.gdb_controller = None
+            with self._io_lock:
+                self.gdb_controller.exit()
+                self.gdb_controller = None
+                self._async_records.clear()
+            self.invalidate_register_names()
+            self.invalidate_state_cache()
             self.connected = False
             self.target_attached = False
 
@@ -1,17 +1,185 @@
 """
 GDB Monitor - 实时监控 GDB 事件
 
-在独立线程中监控 GDB 的异步事件（断点、崩溃、信号等）
+所有会话共用一个后台线程，等待各 GDB 输出管道可读后交给小线程池
+读取并处理异步事件（断点、崩溃、信号等）
 """
 
 import time
+import socket
 import logging
+import selectors
 import threading
-from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Set
 from .gdb_bridge import GDBBridge
 
 logger = logging.getLogger(__name__)
 
+# 管道无法注册到 selector（如 Windows）时的轮询间隔（秒）
+_POLL_INTERVAL = 0.5
+
+# 控制台输出合并发送的窗口（秒）：窗口内的多行输出合成一个事件
+_CONSOLE_FLUSH_DELAY = 0.02
+
+# 循环出错后的退避时间（秒）：从最小值开始逐次翻倍，不超过最大值
+_BACKOFF_MIN = 0.01
+_BACKOFF_MAX = 1.0
+
+# 读取和处理事件的线程数：读取要等待该会话正在执行的命令释放管道，
+# 停止时的状态捕获也会阻塞（最长为命令超时），都在池中执行，
+# 一个卡住的目标不会拖住其他会话
+_DISPATCH_WORKERS = 8
+
+
+class _MonitorLoop:
+    """
+    共享监控循环
+
+    用一个 selector 同时等待所有会话的 GDB 输出，管道可读时才读取，
+    取代每个会话一个轮询线程。注册变更通过唤醒 socket 交给循环线程处理。
+
+    循环线程只负责等待：管道可读的会话交给线程池读取并处理，期间该会话
+    暂停监听，处理完再恢复，因此同一会话的事件仍按顺序处理，而其他会话
+    不受其命令占用管道或状态捕获耗时的影响。
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._changes: List = []            # 待处理的 (monitor, 是否加入)
+        self._woken: Set['GDBMonitor'] = set()
+        self._polled: Set['GDBMonitor'] = set()
+        self._busy: Set['GDBMonitor'] = set()   # 正在线程池中读取/处理的会话
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pipes: Dict['GDBMonitor', Any] = {}
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def add(self, monitor: 'GDBMonitor'):
+        """加入监控，首次使用时启动循环线程"""
+        with self._lock:
+            self._changes.append((monitor, True))
+            if not self.is_running():
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=_DISPATCH_WORKERS,
+                                                        thread_name_prefix="GDBMonitorDispatch")
+                self._thread = threading.Thread(target=self._run, daemon=True, name="GDBMonitor")
+                self._thread.start()
+        self._wake()
+
+    def remove(self, monitor: 'GDBMonitor'):
+        """移出监控"""
+        with self._lock:
+            self._changes.append((monitor, False))
+        self._wake()
+
+    def wake(self, monitor: 'GDBMonitor'):
+        """让循环处理该会话暂存的异步通知"""
+        with self._lock:
+            self._woken.add(monitor)
+        self._wake()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # 缓冲区已满说明循环已有待处理的唤醒
+
+    def _apply_changes(self):
+        with self._lock:
+            changes, self._changes = self._changes, []
+        for monitor, added in changes:
+            pipe = self._pipes.pop(monitor, None)
+            if pipe is not None:
+                try:
+                    self._selector.unregister(pipe)
+                except (KeyError, ValueError, OSError):
+                    pass
+            self._polled.discard(monitor)
+            if not added or not monitor.monitoring:
+                continue
+
+            pipe = monitor.bridge.output_pipe()
+            if pipe is None:
+                continue
+            try:
+                self._selector.register(pipe, selectors.EVENT_READ, monitor)
+                self._pipes[monitor] = pipe
+            except (ValueError, OSError):
+                # 该平台不支持 select 管道，退化为定时轮询
+                self._polled.add(monitor)
+
+    def _drop_dead(self):
+        """移除 GDB 已退出（管道失效）的会话，避免 select 反复出错"""
+        for monitor, pipe in list(self._pipes.items()):
+            if monitor.bridge.output_pipe() is not pipe:
+                with self._lock:
+                    self._changes.append((monitor, False))
+
+    def _dispatch(self, monitor: 'GDBMonitor'):
+        """在线程池中读取并处理一个会话的输出，完成后恢复监听该会话"""
+        try:
+            responses = monitor._poll()
+            if responses:
+                monitor._handle_responses(responses)
+        finally:
+            with self._lock:
+                self._busy.discard(monitor)
+                self._changes.append((monitor, True))
+            self._wake()
+
+    def _run(self):
+        logger.info("Monitor loop started")
+        backoff = _BACKOFF_MIN
+
+        while True:
+            try:
+                self._apply_changes()
+                timeout = _POLL_INTERVAL if self._polled else None
+                ready = set(self._polled)
+
+                for key, _ in self._selector.select(timeout):
+                    if key.data is None:
+                        try:
+                            while self._wake_r.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                    else:
+                        ready.add(key.data)
+
+                with self._lock:
+                    # 处理中的会话保留唤醒标记，恢复监听后再读取期间暂存的通知
+                    ready |= self._woken - self._busy
+                    self._woken &= self._busy
+                    ready -= self._busy
+
+                    for monitor in ready:
+                        if not monitor.monitoring:
+                            continue
+                        # 暂停监听直到处理完成，避免管道持续可读导致空转
+                        self._busy.add(monitor)
+                        self._changes.append((monitor, False))
+                        self._executor.submit(self._dispatch, monitor)
+
+                backoff = _BACKOFF_MIN
+
+            except Exception as e:
+                logger.error(f"Error in monitor loop: {e}")
+                self._drop_dead()
+                time.sleep(backoff)  # 避免快速失败循环
+                backoff = min(backoff * 2, _BACKOFF_MAX)
+
+
+_monitor_loop = _MonitorLoop()
+
 
 class GDBMonitor:
     """
@@ -31,7 +199,6 @@ class GDBMonitor:
         self.bridge = bridge
         self.socketio = socketio
         self.monitoring = False
-        self.monitor_thread: Optional[threading.Thread] = None
         self.event_callbacks: Dict[str, List[Callable]] = {
             'stopped': [],
             'breakpoint-hit': [],
@@ -39,8 +206,28 @@ class GDBMonitor:
             'exited': []
         }
 
+        # 待发送的控制台输出
+        self._console_buffer: List[str] = []
+        self._console_lock = threading.Lock()
+
+        # 按响应类型 / 异步通知名分发，代替逐个比较的 if/elif 链
+        self._type_handlers: Dict[str, Callable[[Optional[str], Any], None]] = {
+            'console': self._on_console,  # 控制台输出（如打印语句）
+            'log': self._on_log,          # GDB 日志
+            'notify': self._on_notify,    # 异步通知（重要事件）
+            # 'result' 为命令执行结果，由 execute_mi_command 处理
+        }
+        self._notify_handlers: Dict[str, Callable[[Any], None]] = {
+            'stopped': self._on_stopped,               # 程序停止
+            'running': self._on_running,               # 程序继续运行
+            'thread-created': self._on_thread_created, # 线程创建
+            'thread-group-started': self._on_target_changed,
+            'thread-group-exited': self._on_target_changed,
+            'library-loaded': self._on_target_changed,
+        }
+
     def start_monitoring(self):
-        """开始监控（在独立线程中运行）"""
+        """开始监控（由共享监控线程处理）"""
         if self.monitoring:
             logger.warning("Monitor already running")
             return False
@@ -50,12 +237,8 @@ class GDBMonitor:
             return False
 
         self.monitoring = True
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            daemon=True,
-            name="GDBMonitor"
-        )
-        self.monitor_thread.start()
+        self.bridge.on_async_records = lambda: _monitor_loop.wake(self)
+        _monitor_loop.add(self)
         logger.info("GDB monitoring started")
         return True
 
@@ -66,10 +249,9 @@ class GDBMonitor:
 
         logger.info("Stopping GDB monitoring")
         self.monitoring = False
-
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=2.0)
-            self.monitor_thread = None
+        self.bridge.on_async_records = None
+        _monitor_loop.remove(self)
+        self.bridge.discard_async_records()
 
     def register_callback(self, event_type: str, callback: Callable):
         """
@@ -84,33 +266,40 @@ class GDBMonitor:
         else:
             logger.warning(f"Unknown event type: {event_type}")
 
-    def _monitor_loop(self):
-        """监控循环（在独立线程中运行）"""
-        logger.info("Monitor loop started")
-
-        while self.monitoring:
+    def _fire_callbacks(self, event_type: str, payload: Dict):
+        """调用某类事件的全部回调；未注册回调（默认情况）时直接返回"""
+        callbacks = self.event_callbacks[event_type]
+        if not callbacks:
+            return
+        for callback in callbacks:
+            # 逐个捕获异常，一个回调出错不影响其余回调
             try:
-                # 检查 GDB 控制器是否还在运行
-                if not self.bridge.gdb_controller:
-                    logger.warning("GDB controller lost, stopping monitor")
-                    break
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Error in {event_type} callback: {e}")
 
-                # 获取输出（非阻塞）
-                responses = self.bridge.gdb_controller.get_gdb_response(
-                    timeout_sec=0.5,
-                    raise_error_on_timeout=False
-                )
+    def _poll(self) -> List[Dict[str, Any]]:
+        """读取已到达的输出（在处理线程池中调用），处理交给 _handle_responses"""
+        # 检查 GDB 进程是否还在运行
+        if self.bridge.output_pipe() is None:
+            logger.warning("GDB controller lost, stopping monitor")
+            self.stop_monitoring()
+            return []
 
-                # 处理响应
-                for response in responses:
-                    self._handle_response(response)
+        try:
+            # 获取异步输出（不等待）
+            return self.bridge.read_async_responses(timeout_sec=0)
+        except Exception as e:
+            logger.error(f"Error in monitor loop: {e}")
+            return []
 
+    def _handle_responses(self, responses: List[Dict[str, Any]]):
+        """按顺序处理一批响应（在处理线程池中调用）"""
+        for response in responses:
+            try:
+                self._handle_response(response)
             except Exception as e:
-                logger.error(f"Error in monitor loop: {e}")
-                time.sleep(0.1)  # 避免快速失败循环
-
-        logger.info("Monitor loop stopped")
-        self.monitoring = False
+                logger.error(f"Error handling GDB response: {e}")
 
     def _handle_response(self, response: Dict[str, Any]):
         """
@@ -119,36 +308,59 @@ class GDBMonitor:
         Args:
             response: GDB/MI 响应字典
         """
-        msg_type = response.get('type')
-        message = response.get('message')
-        payload = response.get('payload', {})
-
-        # 调试输出
-        if msg_type == 'console':
-            # 控制台输出（如打印语句）
-            self._emit_event('console_output', {
-                'text': payload
-            })
-        elif msg_type == 'log':
-            # GDB 日志
-            logger.debug(f"GDB log: {payload}")
-
-        # 异步通知（重要事件）
-        elif msg_type == 'notify':
-            if message == 'stopped':
-                # 程序停止事件
-                self._on_stopped(payload)
-            elif message == 'running':
-                # 程序继续运行
-                self._emit_event('running', payload)
-            elif message == 'thread-created':
-                # 线程创建
-                self._emit_event('thread_created', payload)
-
-        # 结果消息
-        elif msg_type == 'result':
-            # 命令执行结果（通常由 execute_mi_command 处理）
-            pass
+        handler = self._type_handlers.get(response.get('type'))
+        if handler:
+            handler(response.get('message'), response.get('payload', {}))
+
+    def _on_console(self, message: Optional[str], payload: Any):
+        """
+        转发控制台输出
+
+        输出密集时逐行发送开销很大，先缓存并在短时间窗口后合并为一个事件
+        """
+        if not self.socketio:
+            self._emit_event('console_output', {'text': payload})
+            return
+
+        with self._console_lock:
+            schedule = not self._console_buffer
+            self._console_buffer.append(payload if isinstance(payload, str) else str(payload))
+        if schedule:
+            self.socketio.start_background_task(self._flush_console_later)
+
+    def _flush_console_later(self):
+        """等待合并窗口结束后发送缓存的控制台输出"""
+        self.socketio.sleep(_CONSOLE_FLUSH_DELAY)
+        self._flush_console()
+
+    def _flush_console(self):
+        """立即发送缓存的控制台输出"""
+        with self._console_lock:
+            lines, self._console_buffer = self._console_buffer, []
+        if lines:
+            self._emit_event('console_output', {'text': ''.join(lines)})
+
+    def _on_log(self, message: Optional[str], payload: Any):
+        """记录 GDB 日志"""
+        logger.debug(f"GDB log: {payload}")
+
+    def _on_notify(self, message: Optional[str], payload: Any):
+        """分发异步通知"""
+        handler = self._notify_handlers.get(message)
+        if handler:
+            handler(payload)
+
+    def _on_running(self, payload: Any):
+        """程序继续运行"""
+        self._emit_event('running', payload)
+
+    def _on_thread_created(self, payload: Any):
+        """线程创建"""
+        self._emit_event('thread_created', payload)
+
+    def _on_target_changed(self, payload: Any):
+        """新进程或新的目标文件：寄存器布局可能变化"""
+        self.bridge.invalidate_register_names()
 
     def _on_stopped(self, payload: Dict[str, Any]):
         """
@@ -161,11 +373,7 @@ class GDBMonitor:
         logger.info(f"Program stopped: {reason}")
 
         # 触发回调
-        for callback in self.event_callbacks['stopped']:
-            try:
-                callback(payload)
-            except Exception as e:
-                logger.error(f"Error in stopped callback: {e}")
+        self._fire_callbacks('stopped', payload)
 
         # 根据停止原因处理
         if reason == 'breakpoint-hit':
@@ -189,11 +397,7 @@ class GDBMonitor:
         logger.info(f"Breakpoint {bkptno} hit")
 
         # 触发回调
-        for callback in self.event_callbacks['breakpoint-hit']:
-            try:
-                callback(payload)
-            except Exception as e:
-                logger.error(f"Error in breakpoint-hit callback: {e}")
+        self._fire_callbacks('breakpoint-hit', payload)
 
         # 自动捕获状态
         state = self._auto_capture_state('breakpoint')
@@ -214,11 +418,7 @@ class GDBMonitor:
         logger.warning(f"Signal received: {signal_name} - {signal_meaning}")
 
         # 触发回调
-        for callback in self.event_callbacks['signal-received']:
-            try:
-                callback(payload)
-            except Exception as e:
-                logger.error(f"Error in signal-received callback: {e}")
+        self._fire_callbacks('signal-received', payload)
 
         # 自动捕获完整调试信息
         state = self._auto_capture_state('signal')
@@ -241,11 +441,7 @@ class GDBMonitor:
         logger.info(f"Program exited with code {exit_code}")
 
         # 触发回调
-        for callback in self.event_callbacks['exited']:
-            try:
-                callback(payload)
-            except Exception as e:
-                logger.error(f"Error in exited callback: {e}")
+        self._fire_callbacks('exited', payload)
 
         # 推送到前端
         self._emit_event('program_exited', {
@@ -270,20 +466,8 @@ class GDBMonitor:
         }
 
         try:
-            # 获取调用栈
-            bt_result = self.bridge.get_backtrace()
-            if bt_result.get('success'):
-                state['backtrace'] = bt_result.get('frames', [])
-
-            # 获取寄存器
-            reg_result = self.bridge.get_registers()
-            if reg_result.get('success'):
-                state['registers'] = reg_result.get('registers', {})
-
-            # 如果是信号，获取当前帧的详细信息
-            if reason == 'signal':
-                frame_info = self.bridge.execute_cli_command('info frame')
-                state['frame_info'] = frame_info.get('output', '')
+            # 一次往返获取调用栈、寄存器；如果是信号，同时获取当前帧的详细信息
+            state.update(self.bridge.capture_state(frame_info=(reason == 'signal')))
 
         except Exception as e:
             logger.error(f"Error capturing state: {e}")
@@ -299,6 +483,10 @@ class GDBMonitor:
             event_name: 事件名称
             data: 事件数据
         """
+        if event_name != 'console_output':
+            # 保持事件顺序：先发出已缓存的控制台输出
+            self._flush_console()
+
         if self.socketio:
             try:
                 self.socketio.emit(f'gdb_{event_name}', data)
@@ -319,5 +507,5 @@ class GDBMonitor:
             'monitoring': self.monitoring,
             'gdb_connected': self.bridge.connected,
             'target_attached': self.bridge.target_attached,
-            'thread_alive': self.monitor_thread.is_alive() if self.monitor_thread else False
+            'thread_alive': self.monitoring and _monitor_loop.is_running()
         }
@@ -5,7 +5,10 @@ WebSocket Handler - WebSocket 事件处理
 """
 
 import logging
+import threading
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
+from flask import request
 from flask_socketio import emit, join_room, leave_room
 from .gdb_bridge import GDBBridge
 from .gdb_monitor import GDBMonitor
@@ -13,11 +16,28 @@ from .gdb_monitor import GDBMonitor
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class GDBSession:
+    """
+    单个 GDB 会话
+
+    lock 串行化同一会话的启动/连接/断开等生命周期操作；
+    命令与监控线程对 GDB 管道的读写由 GDBBridge 自身加锁。
+    """
+    bridge: GDBBridge
+    monitor: GDBMonitor
+    connected: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
 class GDBSessionManager:
     """
     GDB 会话管理器
 
     管理多个 GDB 会话（每个 WebSocket 连接一个会话）
+
+    sessions 采用写时复制：增删会话时在锁内构造新字典再整体替换，
+    查询直接读取当前字典，无需加锁
     """
 
     def __init__(self, socketio):
@@ -28,7 +48,8 @@ class GDBSessionManager:
             socketio: Flask-SocketIO 实例
         """
         self.socketio = socketio
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, GDBSession] = {}
+        self._write_lock = threading.Lock()
 
     def create_session(self, session_id: str) -> bool:
         """
@@ -40,23 +61,22 @@ class GDBSessionManager:
         Returns:
             bool: 创建成功返回 True
         """
-        if session_id in self.sessions:
-            logger.warning(f"Session {session_id} already exists")
-            return False
+        with self._write_lock:
+            if session_id in self.sessions:
+                logger.warning(f"Session {session_id} already exists")
+                return False
 
-        bridge = GDBBridge()
-        monitor = GDBMonitor(bridge, self.socketio)
+            bridge = GDBBridge()
+            monitor = GDBMonitor(bridge, self.socketio)
 
-        self.sessions[session_id] = {
-            'bridge': bridge,
-            'monitor': monitor,
-            'connected': False
-        }
+            sessions = dict(self.sessions)
+            sessions[session_id] = GDBSession(bridge=bridge, monitor=monitor)
+            self.sessions = sessions
 
         logger.info(f"Created GDB session: {session_id}")
         return True
 
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    def get_session(self, session_id: str) -> Optional[GDBSession]:
         """
         获取会话
 
@@ -75,23 +95,26 @@ class GDBSessionManager:
         Args:
             session_id: 会话 ID
         """
-        session = self.sessions.get(session_id)
-        if not session:
-            return
+        with self._write_lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return
+
+            # 删除会话
+            sessions = dict(self.sessions)
+            del sessions[session_id]
+            self.sessions = sessions
 
-        # 停止监控
-        monitor: GDBMonitor = session['monitor']
-        monitor.stop_monitoring()
+        with session.lock:
+            # 停止监控
+            session.monitor.stop_monitoring()
 
-        # 关闭 GDB
-        bridge: GDBBridge = session['bridge']
-        bridge.stop()
+            # 关闭 GDB
+            session.bridge.stop()
 
-        # 删除会话
-        del self.sessions[session_id]
         logger.info(f"Destroyed GDB session: {session_id}")
 
-    def get_all_sessions(self) -> Dict[str, Dict[str, Any]]:
+    def get_all_sessions(self) -> Dict[str, GDBSession]:
         """获取所有会话"""
         return self.sessions
 
@@ -108,7 +131,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
     @socketio.on('connect')
     def handle_connect():
         """处理 WebSocket 连接"""
-        from flask import request
         session_id = request.sid
         logger.info(f"WebSocket connected: {session_id}")
 
@@ -123,7 +145,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
     @socketio.on('disconnect')
     def handle_disconnect():
         """处理 WebSocket 断开"""
-        from flask import request
         session_id = request.sid
         logger.info(f"WebSocket disconnected: {session_id}")
 
@@ -142,7 +163,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
                 'gdb_args': ['-q', '--nx'],  // 可选的 GDB 参数
             }
         """
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -150,11 +170,12 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         gdb_args = data.get('gdb_args', [])
 
         # 启动 GDB
-        success = bridge.start(gdb_args)
+        with session.lock:
+            success = bridge.start(gdb_args)
 
         if success:
             logger.info(f"GDB started for session {session_id}")
@@ -174,7 +195,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
                 'auto_monitor': true  // 是否自动启动监控
             }
         """
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -182,8 +202,8 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
-        monitor: GDBMonitor = session['monitor']
+        bridge: GDBBridge = session.bridge
+        monitor: GDBMonitor = session.monitor
 
         target = data.get('target')
         if not target:
@@ -193,22 +213,23 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             })
             return
 
-        # 如果 GDB 还未启动，先启动
-        if not bridge.connected:
-            bridge.start()
+        with session.lock:
+            # 如果 GDB 还未启动，先启动
+            if not bridge.connected:
+                bridge.start()
 
-        # 连接到目标
-        result = bridge.connect_to_target(target)
+            # 连接到目标
+            result = bridge.connect_to_target(target)
 
-        if result.get('success'):
-            session['connected'] = True
+            if result.get('success'):
+                session.connected = True
 
-            # 启动监控（如果请求）
-            auto_monitor = data.get('auto_monitor', True)
-            if auto_monitor:
-                monitor.start_monitoring()
+                # 启动监控（如果请求）
+                auto_monitor = data.get('auto_monitor', True)
+                if auto_monitor:
+                    monitor.start_monitoring()
 
-            logger.info(f"Connected to target '{target}' for session {session_id}")
+                logger.info(f"Connected to target '{target}' for session {session_id}")
 
         emit('gdb_connect_result', result)
 
@@ -219,12 +240,11 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
 
         Args:
             data: {
-                'command': 'backtrace',  // 命令
+                'command': 'backtrace',  // 命令（CLI 命令可多行，一行一条）
                 'type': 'cli' | 'mi',    // 命令类型
                 'args': {}               // 可选参数
             }
         """
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -232,7 +252,7 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
 
         if not bridge.connected:
             emit('command_result', {
@@ -245,7 +265,11 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
         cmd_type = data.get('type', 'cli')
 
         try:
-            if cmd_type == 'cli':
+            if cmd_type == 'cli' and command and '\n' in command.strip():
+                # 多行 CLI 命令一次发给 GDB
+                lines = [line for line in command.splitlines() if line.strip()]
+                result = bridge.execute_cli_batch(lines)
+            elif cmd_type == 'cli':
                 result = bridge.execute_cli_command(command)
             else:
                 # MI 命令
@@ -256,6 +280,9 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
                     'responses': responses
                 }
 
+            # 任意命令都可能修改内存或寄存器
+            bridge.invalidate_state_cache()
+
             emit('command_result', result)
 
         except Exception as e:
@@ -275,7 +302,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
                 'location': 'panic' | 'main.c:42' | '*0x80000000'
             }
         """
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -283,7 +309,7 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         location = data.get('location')
 
         result = bridge.set_breakpoint(location)
@@ -292,7 +318,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
     @socketio.on('gdb_continue')
     def handle_continue():
         """处理继续执行请求"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -300,14 +325,13 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         result = bridge.continue_execution()
         emit('continue_result', result)
 
     @socketio.on('gdb_step_over')
     def handle_step_over():
         """处理单步执行（跳过函数）"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -315,14 +339,13 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         result = bridge.step_over()
         emit('step_result', result)
 
     @socketio.on('gdb_step_into')
     def handle_step_into():
         """处理单步执行（进入函数）"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -330,14 +353,21 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         result = bridge.step_into()
         emit('step_result', result)
 
     @socketio.on('gdb_get_backtrace')
-    def handle_get_backtrace():
-        """处理获取调用栈请求"""
-        from flask import request
+    def handle_get_backtrace(data: Optional[Dict[str, Any]] = None):
+        """
+        处理获取调用栈请求
+
+        Args:
+            data: {
+                'stream': false,  // 可选：分段发送 backtrace_chunk 事件
+                'chunk': 64       // 可选：每段帧数
+            }
+        """
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -345,14 +375,24 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
+        data = data or {}
+
+        if data.get('stream'):
+            # 逐段发送，最后以 done=True 的空段结束
+            count = 0
+            for frames in bridge.iter_backtrace(int(data.get('chunk', 64))):
+                count += len(frames)
+                emit('backtrace_chunk', {'frames': frames, 'done': False})
+            emit('backtrace_chunk', {'frames': [], 'done': True, 'success': count > 0})
+            return
+
         result = bridge.get_backtrace()
         emit('backtrace_result', result)
 
     @socketio.on('gdb_get_registers')
     def handle_get_registers():
         """处理获取寄存器请求"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -360,7 +400,7 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         result = bridge.get_registers()
         emit('registers_result', result)
 
@@ -372,10 +412,11 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
         Args:
             data: {
                 'address': '0x80000000',
-                'size': 256
+                'size': 256,
+                'stream': false,  // 可选：按 4 KB 分段发送 memory_chunk 事件
+                'prefetch': false  // 可选：按整页预读并缓存，供滚动查看 RAM 使用
             }
         """
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -383,17 +424,27 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
+        bridge: GDBBridge = session.bridge
         address = data.get('address')
         size = data.get('size', 256)
+        prefetch = bool(data.get('prefetch', False))
+
+        if data.get('stream'):
+            # 逐段发送，最后以 done=True 的空段结束
+            success = False
+            for part in bridge.iter_memory(address, size, prefetch=prefetch):
+                success = part.get('success', False)
+                if success:
+                    emit('memory_chunk', dict(part, done=False))
+            emit('memory_chunk', {'encoding': 'base64', 'contents': '', 'done': True, 'success': success})
+            return
 
-        result = bridge.read_memory(address, size)
+        result = bridge.read_memory(address, size, prefetch)
         emit('memory_result', result)
 
     @socketio.on('gdb_disconnect')
     def handle_gdb_disconnect():
         """处理断开 GDB 连接"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -401,16 +452,17 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        bridge: GDBBridge = session['bridge']
-        monitor: GDBMonitor = session['monitor']
+        bridge: GDBBridge = session.bridge
+        monitor: GDBMonitor = session.monitor
 
-        # 停止监控
-        monitor.stop_monitoring()
+        with session.lock:
+            # 停止监控
+            monitor.stop_monitoring()
 
-        # 停止 GDB
-        bridge.stop()
+            # 停止 GDB
+            bridge.stop()
 
-        session['connected'] = False
+            session.connected = False
 
         emit('gdb_disconnected', {'success': True})
         logger.info(f"GDB disconnected for session {session_id}")
@@ -418,7 +470,6 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
     @socketio.on('gdb_status')
     def handle_get_status():
         """处理获取状态请求"""
-        from flask import request
         session_id = request.sid
 
         session = session_manager.get_session(session_id)
@@ -426,7 +477,7 @@ def register_websocket_handlers(socketio, session_manager: GDBSessionManager):
             emit('error', {'message': 'Session not found'})
             return
 
-        monitor: GDBMonitor = session['monitor']
+        monitor: GDBMonitor = session.monitor
         status = monitor.get_status()
 
         emit('status_result', status)
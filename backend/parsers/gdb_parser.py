@@ -1,7 +1,61 @@
 """Parser for GDB output (backtrace, registers, etc.)."""
 
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional: google-re2 matches in linear time (DFA, no backtracking), which
+# pays off on very large backtrace dumps; fall back to re when not installed
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Compiled once; the parse loops below run them on every line
+# Pattern: #<num> <addr> in <function> (...) at <file>:<line>
+# Matched over the whole buffer: '^.*?' takes the first frame on each line,
+# and [^\S\n] / [^...\n] keep every match within a single line
+_BT_PATTERN = (
+    r'(?m)^.*?#(\d+)[^\S\n]+(?:0x)?([0-9a-fA-F]+)[^\S\n]+in[^\S\n]+([^\s(]+)[^\S\n]*'
+    r'(?:\([^)\n]*\))?[^\S\n]*(?:at[^\S\n]+([^:\n]+):(\d+))?'
+)
+_BT_RE = re.compile(_BT_PATTERN)
+_BT_RE2 = re2.compile(_BT_PATTERN) if re2 is not None else None
+# Below this size RE2's per-call setup costs more than backtracking saves
+_RE2_MIN_SIZE = 256 * 1024
+# Pattern: <reg_name> <value> [additional info]
+_REG_RE = re.compile(r'(\w+)\s+(0x[0-9a-fA-F]+|\d+)')
+_VALUE_RE = re.compile(r'\$\d+\s*=\s*(.+)')
+_PTR_RE = re.compile(r'\(([^)]+)\)\s*(0x[0-9a-fA-F]+)')
+# Any RISC-V register name as a substring; one scan instead of one per name
+_RISCV_REG_RE = re.compile(r'ra|sp|gp|tp|pc|a0|a1|s0|s1')
+
+
+class Frame:
+    """
+    One parsed backtrace frame.
+
+    A slotted record, far smaller than the equivalent dict for long
+    backtraces; to_dict() gives the parse_backtrace() form.
+    """
+
+    __slots__ = ('frame_num', 'addr', 'function', 'file', 'line')
+
+    def __init__(self, frame_num: int, addr: str, function: str,
+                 file: str, line: str):
+        self.frame_num = frame_num
+        self.addr = addr
+        self.function = function
+        self.file = file
+        self.line = line
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'frame_num': self.frame_num,
+            'addr': self.addr,
+            'function': self.function,
+            'file': self.file,
+            'line': self.line
+        }
 
 
 class GDBParser:
@@ -19,22 +73,21 @@ class GDBParser:
         Returns:
             List of frame dicts with keys: frame_num, addr, function, file, line
         """
-        frames = []
-        # Pattern: #<num> <addr> in <function> (...) at <file>:<line>
-        pattern = r'#(\d+)\s+(?:0x)?([0-9a-fA-F]+)\s+in\s+([^\s(]+)\s*(?:\([^)]*\))?\s*(?:at\s+([^:]+):(\d+))?'
+        return [frame.to_dict() for frame in GDBParser.parse_backtrace_frames(text)]
 
-        for line in text.split('\n'):
-            match = re.search(pattern, line)
-            if match:
-                frames.append({
-                    'frame_num': int(match.group(1)),
-                    'addr': match.group(2),
-                    'function': match.group(3),
-                    'file': match.group(4) if match.group(4) else 'unknown',
-                    'line': match.group(5) if match.group(5) else 'unknown'
-                })
-
-        return frames
+    @staticmethod
+    def parse_backtrace_frames(text: str) -> List[Frame]:
+        """Parse GDB backtrace output into Frame records (see parse_backtrace)."""
+        bt_re = _BT_RE
+        # RE2's \s and \d are ASCII-only, so it gives identical matches only
+        # on ASCII text
+        if _BT_RE2 is not None and len(text) >= _RE2_MIN_SIZE and text.isascii():
+            bt_re = _BT_RE2
+        return [
+            Frame(int(match.group(1)), match.group(2), match.group(3),
+                  match.group(4) or 'unknown', match.group(5) or 'unknown')
+            for match in bt_re.finditer(text)
+        ]
 
     @staticmethod
     def parse_registers(text: str, arch: str = 'auto') -> Dict[str, str]:
@@ -45,25 +98,16 @@ class GDBParser:
             rax            0x0      0
             rip            0x80100abc       0x80100abc <panic+42>
 
+        The register line format is the same on every architecture, so
+        arch does not affect parsing (it is accepted for API compatibility).
+
         Returns:
             Dict mapping register names to values
         """
         registers = {}
 
-        # Auto-detect architecture
-        if arch == 'auto':
-            if 'rax' in text or 'rip' in text:
-                arch = 'x86_64'
-            elif 'eax' in text or 'eip' in text:
-                arch = 'x86_32'
-            elif 'ra' in text or 'sp' in text and 'pc' in text:
-                arch = 'riscv'
-
-        # Pattern: <reg_name> <value> [additional info]
-        pattern = r'(\w+)\s+(0x[0-9a-fA-F]+|\d+)'
-
         for line in text.split('\n'):
-            match = re.search(pattern, line)
+            match = _REG_RE.search(line)
             if match:
                 reg_name = match.group(1)
                 reg_value = match.group(2)
@@ -85,15 +129,18 @@ class GDBParser:
         """
         result = {}
 
+        # Each pattern can only start at its leading literal ('$' / '('), so
+        # jump to its first occurrence instead of scanning from position 0
+
         # Try to extract variable value
-        value_pattern = r'\$\d+\s*=\s*(.+)'
-        match = re.search(value_pattern, text)
+        start = text.find('$')
+        match = _VALUE_RE.search(text, start) if start >= 0 else None
         if match:
             result['raw_value'] = match.group(1).strip()
 
         # Try to extract pointer value
-        ptr_pattern = r'\(([^)]+)\)\s*(0x[0-9a-fA-F]+)'
-        match = re.search(ptr_pattern, text)
+        start = text.find('(')
+        match = _PTR_RE.search(text, start) if start >= 0 else None
         if match:
             result['type'] = match.group(1)
             result['value'] = match.group(2)
@@ -109,7 +156,7 @@ class GDBParser:
             return 'x86_64'
         elif 'eax' in text_lower or 'eip' in text_lower or 'esp' in text_lower:
             return 'x86_32'
-        elif any(reg in text_lower for reg in ['ra', 'sp', 'gp', 'tp', 'pc', 'a0', 'a1', 's0', 's1']):
+        elif _RISCV_REG_RE.search(text_lower):
             return 'riscv'
 
         return 'unknown'
@@ -1,7 +1,115 @@
 """Parser for page table dumps."""
 
 import re
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Optional
+
+# Compiled once; parse_page_table_entry runs them on every line of a dump
+# Pattern 1: VA 0x... -> PA 0x... or 0x... -> 0x...
+_VA_PA_RE = re.compile(r'(?:VA\s+)?(0x[0-9a-fA-F]+)\s*(?:->|→)\s*(?:PA\s+)?(0x[0-9a-fA-F]+)', re.IGNORECASE)
+# x86 flags: P (present), W (write), U (user), etc., in reporting order
+_X86_FLAGS = ('P', 'W', 'U', 'A', 'D', 'PS')
+# A flag counts when it is a whole word, i.e. one of the line's \w+ runs
+_WORD_RE = re.compile(r'\w+')
+# RISC-V flags: rwxu or daguxwrv format
+_FLAG_RE_RISCV = re.compile(r'([r-][w-][x-][u-]|[daguxwrv-]+)')
+
+
+@lru_cache(maxsize=1024)
+def _riscv_flag_fields(flag_str: str) -> Dict[str, object]:
+    """
+    Mapping fields for a RISC-V flag string.
+
+    A dump uses only a handful of distinct flag strings, so each is decoded
+    once. The pattern above matches lower-case letters only, so no
+    case folding is needed for the valid bit.
+    """
+    return {
+        'flags_raw': flag_str,
+        'readable': 'r' in flag_str,
+        'writable': 'w' in flag_str,
+        'executable': 'x' in flag_str,
+        'user': 'u' in flag_str,
+        'valid': 'v' in flag_str,
+    }
+
+
+# Pattern: [0x... - 0x...] or 0x...0x... or 0x...-0x...
+_RANGE_RE = re.compile(r'\[?(0x[0-9a-fA-F]+)\s*[-–.]+\s*(0x[0-9a-fA-F]+)\]?')
+
+# PTE flag bits, in the order they appear in parse_pte_value results
+_X86_PTE_FLAGS = (
+    ('present', 0x1),
+    ('writable', 0x2),
+    ('user', 0x4),
+    ('write_through', 0x8),
+    ('cache_disable', 0x10),
+    ('accessed', 0x20),
+    ('dirty', 0x40),
+    ('page_size', 0x80),
+    ('global', 0x100),
+)
+_X86_PTE_FLAG_MASK = 0x1FF
+
+# RISC-V PTE format (Sv39/Sv48)
+_RISCV_PTE_FLAGS = (
+    ('valid', 0x1),
+    ('readable', 0x2),
+    ('writable', 0x4),
+    ('executable', 0x8),
+    ('user', 0x10),
+    ('global', 0x20),
+    ('accessed', 0x40),
+    ('dirty', 0x80),
+)
+_RISCV_PTE_FLAG_MASK = 0xFF
+
+# Decoded flags indexed by the low PTE bits, so decoding an entry is one
+# lookup instead of a bit test per flag (512 + 256 small dicts)
+_X86_PTE_FLAG_TABLE = tuple(
+    {name: bool(bits & mask) for name, mask in _X86_PTE_FLAGS}
+    for bits in range(_X86_PTE_FLAG_MASK + 1)
+)
+_RISCV_PTE_FLAG_TABLE = tuple(
+    {name: bool(bits & mask) for name, mask in _RISCV_PTE_FLAGS}
+    for bits in range(_RISCV_PTE_FLAG_MASK + 1)
+)
+
+# Per-flag truth tables over the same low bits, for the column decoder
+_X86_PTE_FLAG_COLUMNS = tuple(
+    (name, tuple(bool(bits & mask) for bits in range(_X86_PTE_FLAG_MASK + 1)))
+    for name, mask in _X86_PTE_FLAGS
+)
+_RISCV_PTE_FLAG_COLUMNS = tuple(
+    (name, tuple(bool(bits & mask) for bits in range(_RISCV_PTE_FLAG_MASK + 1)))
+    for name, mask in _RISCV_PTE_FLAGS
+)
+
+
+def _decode_x86_32_pte(pte: int, result: Dict) -> None:
+    result.update(_X86_PTE_FLAG_TABLE[pte & _X86_PTE_FLAG_MASK])
+    result['phys_addr'] = pte & 0xFFFFF000
+
+
+def _decode_x86_64_pte(pte: int, result: Dict) -> None:
+    result.update(_X86_PTE_FLAG_TABLE[pte & _X86_PTE_FLAG_MASK])
+    result['phys_addr'] = pte & 0x000FFFFFFFFFF000
+
+
+def _decode_riscv_pte(pte: int, result: Dict) -> None:
+    result.update(_RISCV_PTE_FLAG_TABLE[pte & _RISCV_PTE_FLAG_MASK])
+    # PPN (physical page number) is in bits 10-53
+    result['ppn'] = (pte >> 10) & 0xFFFFFFFFFFF
+    result['phys_addr'] = result['ppn'] << 12
+
+
+# parse_pte_value dispatches on arch with one dict lookup
+_PTE_DECODERS = {
+    'x86_32': _decode_x86_32_pte,
+    'x86_64': _decode_x86_64_pte,
+    'riscv': _decode_riscv_pte,
+}
 
 
 class PageTableParser:
@@ -16,45 +124,42 @@ class PageTableParser:
         x86: VA 0x0 -> PA 0x2000 (PTE: 0x2003) flags: P W U
         RISC-V: 0x0000000000000000 -> 0x0000000080000000 rwxu-
 
-        Returns list of mappings with VA, PA, and flags.
+        Returns list of mappings with VA and PA (also as integers va_int and
+        pa_int), and flags.
         """
         mappings = []
 
         # Detect architecture
         if arch == 'auto':
-            if 'rwx' in text.lower() or 'daguxwrv' in text.lower():
+            text_lower = text.lower()
+            if 'rwx' in text_lower or 'daguxwrv' in text_lower:
                 arch = 'riscv'
             else:
                 arch = 'x86'
 
         for line in text.split('\n'):
+            # Every mapping has an arrow; skip headers and blank lines without
+            # running the regex
+            if '->' not in line and '→' not in line:
+                continue
+
             mapping = {}
 
             # Try to extract VA -> PA mapping
-            # Pattern 1: VA 0x... -> PA 0x... or 0x... -> 0x...
-            va_pa_pattern = r'(?:VA\s+)?(0x[0-9a-fA-F]+)\s*(?:->|→)\s*(?:PA\s+)?(0x[0-9a-fA-F]+)'
-            match = re.search(va_pa_pattern, line, re.IGNORECASE)
+            match = _VA_PA_RE.search(line)
 
             if match:
                 mapping['va'] = match.group(1)
                 mapping['pa'] = match.group(2)
+                # Parsed once here so consumers don't re-parse the hex strings
+                mapping['va_int'] = int(match.group(1), 16)
+                mapping['pa_int'] = int(match.group(2), 16)
 
                 # Extract flags
                 if arch == 'x86':
                     # x86 flags: P (present), W (write), U (user), etc.
-                    flags = []
-                    if re.search(r'\bP\b', line):
-                        flags.append('P')
-                    if re.search(r'\bW\b', line):
-                        flags.append('W')
-                    if re.search(r'\bU\b', line):
-                        flags.append('U')
-                    if re.search(r'\bA\b', line):
-                        flags.append('A')
-                    if re.search(r'\bD\b', line):
-                        flags.append('D')
-                    if re.search(r'\bPS\b', line):
-                        flags.append('PS')
+                    words = set(_WORD_RE.findall(line))
+                    flags = [flag for flag in _X86_FLAGS if flag in words]
 
                     mapping['flags'] = flags
                     mapping['present'] = 'P' in flags
@@ -63,16 +168,9 @@ class PageTableParser:
 
                 elif arch == 'riscv':
                     # RISC-V flags: rwxu or daguxwrv format
-                    flag_pattern = r'([r-][w-][x-][u-]|[daguxwrv-]+)'
-                    flag_match = re.search(flag_pattern, line)
+                    flag_match = _FLAG_RE_RISCV.search(line)
                     if flag_match:
-                        flag_str = flag_match.group(1)
-                        mapping['flags_raw'] = flag_str
-                        mapping['readable'] = 'r' in flag_str
-                        mapping['writable'] = 'w' in flag_str
-                        mapping['executable'] = 'x' in flag_str
-                        mapping['user'] = 'u' in flag_str
-                        mapping['valid'] = 'v' in flag_str.lower()
+                        mapping.update(_riscv_flag_fields(flag_match.group(1)))
 
                 mapping['arch'] = arch
                 mappings.append(mapping)
@@ -93,40 +191,57 @@ class PageTableParser:
         """
         result = {'raw': hex(pte)}
 
-        if arch in ['x86_32', 'x86_64']:
-            # x86 PTE format
-            result['present'] = bool(pte & 0x1)
-            result['writable'] = bool(pte & 0x2)
-            result['user'] = bool(pte & 0x4)
-            result['write_through'] = bool(pte & 0x8)
-            result['cache_disable'] = bool(pte & 0x10)
-            result['accessed'] = bool(pte & 0x20)
-            result['dirty'] = bool(pte & 0x40)
-            result['page_size'] = bool(pte & 0x80)
-            result['global'] = bool(pte & 0x100)
-
-            # Extract physical address
-            if arch == 'x86_32':
-                result['phys_addr'] = pte & 0xFFFFF000
-            else:  # x86_64
-                result['phys_addr'] = pte & 0x000FFFFFFFFFF000
+        decode = _PTE_DECODERS.get(arch)
+        if decode is not None:
+            decode(pte, result)
+
+        return result
+
+    @staticmethod
+    def parse_pte_values(ptes: Iterable[int], arch: str) -> List[Dict]:
+        """
+        Parse a batch of raw PTE values, e.g. from a page-table walk.
+
+        Returns one parse_pte_value() dict per entry, in input order.
+        """
+        parse = PageTableParser.parse_pte_value
+        return [parse(pte, arch) for pte in ptes]
+
+    @staticmethod
+    def parse_pte_columns(ptes: Iterable[int], arch: str) -> Dict[str, List]:
+        """
+        Parse a batch of raw PTE values into columns.
+
+        Same fields as parse_pte_value, but as one list per field (index i
+        belongs to ptes[i]) instead of one dict per entry, for large walks
+        where a consumer scans a few flags across every entry.
+        """
+        ptes = list(ptes)
+        columns: Dict[str, List] = {'raw': list(map(hex, ptes))}
 
+        if arch in ['x86_32', 'x86_64']:
+            flag_mask, flag_columns = _X86_PTE_FLAG_MASK, _X86_PTE_FLAG_COLUMNS
         elif arch == 'riscv':
-            # RISC-V PTE format (Sv39/Sv48)
-            result['valid'] = bool(pte & 0x1)
-            result['readable'] = bool(pte & 0x2)
-            result['writable'] = bool(pte & 0x4)
-            result['executable'] = bool(pte & 0x8)
-            result['user'] = bool(pte & 0x10)
-            result['global'] = bool(pte & 0x20)
-            result['accessed'] = bool(pte & 0x40)
-            result['dirty'] = bool(pte & 0x80)
-
-            # PPN (physical page number) is in bits 10-53
-            result['ppn'] = (pte >> 10) & 0xFFFFFFFFFFF
-            result['phys_addr'] = result['ppn'] << 12
+            flag_mask, flag_columns = _RISCV_PTE_FLAG_MASK, _RISCV_PTE_FLAG_COLUMNS
+        else:
+            return columns
 
-        return result
+        # Mask each entry once; every flag column is then a C-level map
+        # over its truth table
+        flag_bits = [pte & flag_mask for pte in ptes]
+        for name, table in flag_columns:
+            columns[name] = list(map(table.__getitem__, flag_bits))
+
+        if arch == 'x86_32':
+            columns['phys_addr'] = [pte & 0xFFFFF000 for pte in ptes]
+        elif arch == 'x86_64':
+            columns['phys_addr'] = [pte & 0x000FFFFFFFFFF000 for pte in ptes]
+        else:
+            ppns = [(pte >> 10) & 0xFFFFFFFFFFF for pte in ptes]
+            columns['ppn'] = ppns
+            columns['phys_addr'] = [ppn << 12 for ppn in ppns]
+
+        return columns
 
     @staticmethod
     def extract_address_range(text: str) -> List[Tuple[str, str]]:
@@ -139,10 +254,41 @@ class PageTableParser:
         """
         ranges = []
 
-        # Pattern: [0x... - 0x...] or 0x...0x... or 0x...-0x...
-        pattern = r'\[?(0x[0-9a-fA-F]+)\s*[-–.]+\s*(0x[0-9a-fA-F]+)\]?'
-
-        for match in re.finditer(pattern, text):
+        for match in _RANGE_RE.finditer(text):
             ranges.append((match.group(1), match.group(2)))
 
         return ranges
+
+
+class MappingIndex:
+    """
+    VA-sorted view of parsed mappings for VA -> mapping lookups.
+
+    Sorted once on construction; each find() is a binary search instead of
+    a scan over every mapping.
+    """
+
+    def __init__(self, mappings: Iterable[Dict], page_size: int = 0x1000):
+        """
+        Args:
+            mappings: Output of PageTableParser.parse_page_table_entry
+            page_size: Size of the page each mapping covers
+        """
+        self.page_size = page_size
+        self.mappings = sorted((m for m in mappings if 'va_int' in m),
+                               key=lambda m: m['va_int'])
+        self._starts = [m['va_int'] for m in self.mappings]
+
+    def find(self, va: int) -> Optional[Dict]:
+        """Return the mapping whose page contains va, or None if unmapped."""
+        i = bisect_right(self._starts, va) - 1
+        if i >= 0 and va < self._starts[i] + self.page_size:
+            return self.mappings[i]
+        return None
+
+    def translate(self, va: int) -> Optional[int]:
+        """Translate va to a physical address, or None if unmapped."""
+        mapping = self.find(va)
+        if mapping is None:
+            return None
+        return mapping['pa_int'] + (va - mapping['va_int'])
@@ -1,7 +1,224 @@
 """Parser for trapframe/exception frame dumps."""
 
 import re
-from typing import Dict, Optional
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_HEX_DIGITS_RE = re.compile(r'^[0-9a-fA-F]+$')
+
+# x86 page fault error code bits decoded by decode_x86_page_fault_error_code
+_PF_ERROR_FLAGS = (
+    ('present', 0x1),
+    ('write', 0x2),
+    ('user_mode', 0x4),
+    ('reserved', 0x8),
+    ('instruction_fetch', 0x10),
+)
+_PF_ERROR_MASK = 0x1F
+
+# Decoded flags for every combination of the bits above, indexed by
+# err_code & _PF_ERROR_MASK
+_PF_ERROR_TABLE = tuple(
+    {name: bool(bits & mask) for name, mask in _PF_ERROR_FLAGS}
+    for bits in range(_PF_ERROR_MASK + 1)
+)
+# Per-flag truth tables over the same index, for column-wise batch decoding
+_PF_ERROR_COLUMNS = tuple(
+    (name, tuple(bool(bits & mask) for bits in range(_PF_ERROR_MASK + 1)))
+    for name, mask in _PF_ERROR_FLAGS
+)
+
+
+def _field(key: str, field_name: Optional[str] = None, needle: Optional[str] = None,
+           lead: int = 0) -> Tuple[str, "re.Pattern[str]", str, int]:
+    """
+    (result key, value pattern, needle, lead) for one field.
+
+    field_name is a lower-case regex for the field's name and defaults to
+    the key; the pattern is for lowercased text (see _nocase_pattern for
+    the rest). needle is a lower-case substring every match must contain
+    and also defaults to the key; lead is how many characters a match can
+    start before its needle.
+    """
+    name = field_name or key
+    # Pattern: field_name = 0x... or field_name: 0x... or field_name 0x... (space-separated)
+    # Also match hex numbers without 0x prefix (common in x86 dumps)
+    # The name must be a whole word, so sp does not match inside esp or cs
+    # inside ecx; a leading underscore is allowed for gdb's tf_eip style.
+    pattern = rf'(?<![^\W_])(?:{name})\b\s*[=:]?\s*(0x[0-9a-f]+|[0-9a-f]+)'
+    # Keys built at runtime (a0, s1, ...) are interned like the literals, so
+    # callers' lookups with literal keys hit on identity
+    key = sys.intern(key)
+    return key, re.compile(pattern), needle or key, lead
+
+
+@lru_cache(maxsize=None)
+def _nocase_pattern(pattern: "re.Pattern[str]") -> "re.Pattern[str]":
+    """
+    re.IGNORECASE twin of a _field() pattern, for text lower() cannot fold.
+
+    Only non-ASCII dumps need these, so they are compiled on first use
+    rather than alongside every pattern at import.
+    """
+    return re.compile(pattern.pattern, re.IGNORECASE)
+
+
+# Field tables, compiled once at import. *_FIELDS are always present in the
+# result (None when missing); *_REGS only when found.
+_X86_FIELDS = (
+    _field('trap_no', r'trap(?:no)?', 'trap'),
+    _field('err_code', r'err(?:_?code)?', 'err'),
+    _field('eip', r'[er]?ip', 'ip', lead=1),
+    _field('cs'),
+    _field('eflags'),
+    _field('esp', r'[er]?sp', 'sp', lead=1),
+    _field('ss'),
+    _field('cr2'),
+)
+_X86_REGS = tuple(_field(reg) for reg in (
+    'eax', 'ebx', 'ecx', 'edx', 'esi', 'edi', 'ebp',
+    'rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi', 'rbp'))
+
+_RISCV_FIELDS = (
+    _field('scause'),
+    _field('stval'),
+    _field('sepc'),
+    _field('ra'),
+    _field('sp'),
+    _field('gp'),
+    _field('tp'),
+)
+_RISCV_REGS = tuple(_field(f'{prefix}{i}') for i in range(8) for prefix in ('a', 's', 't'))
+
+# (fields, regs) per architecture: x86 trapframe fields plus any register
+# dump in the trapframe, and RISC-V trapframe fields
+_ARCH_FIELD_TABLES = {
+    'x86_32': (_X86_FIELDS, _X86_REGS),
+    'x86_64': (_X86_FIELDS, _X86_REGS),
+    'riscv': (_RISCV_FIELDS, _RISCV_REGS),
+}
+# Per architecture, key -> (field, only present when found) for LazyTrapframe
+_ARCH_FIELD_SPECS = {
+    arch: {**{field[0]: (field, False) for field in fields}, **{reg[0]: (reg, True) for reg in regs}}
+    for arch, (fields, regs) in _ARCH_FIELD_TABLES.items()
+}
+
+
+def _detect_arch(text_lower: str) -> str:
+    """
+    Guess a dump's architecture from its lowercased text ('auto' if unsure).
+
+    Plain substring tests: every marker is a literal, and str.find outruns a
+    regex scan for the markers that are absent.
+    """
+    if 'eip' in text_lower or 'err' in text_lower:
+        return 'x86_32'
+    if 'rip' in text_lower:
+        return 'x86_64'
+    if 'sepc' in text_lower or 'scause' in text_lower or 'stval' in text_lower:
+        return 'riscv'
+    return 'auto'
+
+
+def _extract_field(text: str, text_lower: Optional[str], pattern: "re.Pattern[str]",
+                   needle: str, lead: int) -> Optional[str]:
+    """
+    Value of one _field() in text, or None.
+
+    text_lower is text.lower() for ASCII text and None otherwise. Values
+    that look like hex without a 0x prefix get one.
+    """
+    if text_lower is not None:
+        pos = text_lower.find(needle)
+        if pos < 0:
+            return None
+        match = pattern.search(text_lower, max(pos - lead, 0))
+        value = text[match.start(1):match.end(1)] if match else None
+    else:
+        match = _nocase_pattern(pattern).search(text)
+        value = match.group(1) if match else None
+    if value is not None:
+        # Normalize: add 0x prefix if not present and looks like hex
+        if not value.startswith('0x') and _HEX_DIGITS_RE.match(value):
+            # Check if it's actually hex (contains a-f) or just decimal
+            if any(c in 'abcdefABCDEF' for c in value):
+                return '0x' + value
+        return value
+    return None
+
+
+_MISSING = object()
+
+
+class LazyTrapframe(Mapping):
+    """
+    Read-only trapframe mapping that extracts each field on first access.
+
+    Same keys and values as TrapframeParser.parse_trapframe, in the same
+    order, but a caller that reads scause and stval only runs those two
+    searches. Iterating, len() and to_dict() extract everything.
+    """
+
+    __slots__ = ('_text', '_text_lower', '_fields', '_regs', '_specs', '_values')
+
+    def __init__(self, text: str, text_lower: Optional[str], arch: str):
+        """
+        Args:
+            text: The dump
+            text_lower: text.lower() for ASCII text, None otherwise
+            arch: Architecture whose field tables apply
+        """
+        self._text = text
+        self._text_lower = text_lower
+        self._fields, self._regs = _ARCH_FIELD_TABLES.get(arch, ((), ()))
+        self._specs = _ARCH_FIELD_SPECS.get(arch, {})
+        self._values: Dict[str, Optional[str]] = {'arch': arch}
+
+    def _lookup(self, key: str):
+        """Value for key, extracting it if needed; _MISSING if absent."""
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        field, optional = self._specs.get(key, (None, False))
+        if field is None:
+            return _MISSING
+        _, pattern, needle, lead = field
+        value = _extract_field(self._text, self._text_lower, pattern, needle, lead)
+        if optional and not value:
+            value = _MISSING
+        self._values[key] = value
+        return value
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __iter__(self):
+        yield 'arch'
+        for field in self._fields:
+            yield field[0]
+        for field in self._regs:
+            if self._lookup(field[0]) is not _MISSING:
+                yield field[0]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        # 'arch' is always present; avoid extracting everything for len()
+        return True
+
+    def to_dict(self) -> Dict:
+        """Plain dict of every field, as parse_trapframe returns it."""
+        return {key: self[key] for key in self}
 
 
 class TrapframeParser:
@@ -48,6 +265,11 @@ class TrapframeParser:
         15: 'Store/AMO Page Fault',
     }
 
+    # Same tables indexed by number (None for unassigned numbers), so
+    # get_trap_description does a bounds check and a tuple index
+    _X86_TRAP_TABLE = tuple(map(X86_TRAPS.get, range(max(X86_TRAPS) + 1)))
+    _RISCV_EXCEPTION_TABLE = tuple(map(RISCV_EXCEPTIONS.get, range(max(RISCV_EXCEPTIONS) + 1)))
+
     @staticmethod
     def parse_trapframe(text: str, arch: str = 'auto') -> Dict:
         """
@@ -57,71 +279,53 @@ class TrapframeParser:
         - trap_no, err_code, eip/rip/pc, esp/rsp/sp, cr2/stval, etc.
         """
         trapframe = {}
+        is_ascii = text.isascii()
+        text_lower = text.lower() if is_ascii or arch == 'auto' else None
 
-        # Auto-detect architecture
         if arch == 'auto':
-            if 'eip' in text.lower() or 'err' in text.lower():
-                arch = 'x86_32'
-            elif 'rip' in text.lower():
-                arch = 'x86_64'
-            elif 'sepc' in text.lower() or 'scause' in text.lower() or 'stval' in text.lower():
-                arch = 'riscv'
+            arch = _detect_arch(text_lower)
 
         trapframe['arch'] = arch
 
-        # Extract numeric values
-        def extract_field(field_name: str) -> Optional[str]:
-            # Pattern: field_name = 0x... or field_name: 0x... or field_name 0x... (space-separated)
-            # Also match hex numbers without 0x prefix (common in x86 dumps)
-            pattern = rf'{field_name}\s*[=:]?\s*(0x[0-9a-fA-F]+|[0-9a-fA-F]+)'
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                value = match.group(1)
-                # Normalize: add 0x prefix if not present and looks like hex
-                if not value.startswith('0x') and re.match(r'^[0-9a-fA-F]+$', value):
-                    # Check if it's actually hex (contains a-f) or just decimal
-                    if any(c in 'abcdefABCDEF' for c in value):
-                        return '0x' + value
-                return value
-            return None
+        tables = _ARCH_FIELD_TABLES.get(arch)
+        if tables is None:
+            return trapframe
+        fields, regs = tables
 
-        if arch == 'x86_32' or arch == 'x86_64':
-            # x86 trapframe fields
-            trapframe['trap_no'] = extract_field(r'\btrap(?:no)?\b')
-            trapframe['err_code'] = extract_field(r'\berr(?:_?code)?\b')
-            trapframe['eip'] = extract_field(r'e?ip')
-            trapframe['cs'] = extract_field(r'cs')
-            trapframe['eflags'] = extract_field(r'eflags')
-            trapframe['esp'] = extract_field(r'e?sp')
-            trapframe['ss'] = extract_field(r'ss')
-            trapframe['cr2'] = extract_field(r'cr2')
-
-            # Also check for register dumps in trapframe
-            for reg in ['eax', 'ebx', 'ecx', 'edx', 'esi', 'edi', 'ebp',
-                       'rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi', 'rbp']:
-                val = extract_field(reg)
-                if val:
-                    trapframe[reg] = val
+        # ASCII text is lowercased once and matched with case-sensitive
+        # patterns; lower() keeps its offsets, so values are still sliced from
+        # the original text. Every field pattern contains its needle
+        # literally, so no match can start more than `lead` characters before
+        # the needle's first occurrence: absent fields skip the regex, and
+        # present ones search from there instead of from the top of the dump.
+        # Other text keeps re.IGNORECASE, whose folding lower() does not match.
+        if not is_ascii:
+            text_lower = None
 
-        elif arch == 'riscv':
-            # RISC-V trapframe fields
-            trapframe['scause'] = extract_field(r'scause')
-            trapframe['stval'] = extract_field(r'stval')
-            trapframe['sepc'] = extract_field(r'sepc')
-            trapframe['ra'] = extract_field(r'\bra\b')
-            trapframe['sp'] = extract_field(r'\bsp\b')
-            trapframe['gp'] = extract_field(r'\bgp\b')
-            trapframe['tp'] = extract_field(r'\btp\b')
-
-            for i in range(8):
-                for prefix in ['a', 's', 't']:
-                    reg = f'{prefix}{i}'
-                    val = extract_field(reg)
-                    if val:
-                        trapframe[reg] = val
+        # Extract numeric values
+        for key, pattern, needle, lead in fields:
+            trapframe[key] = _extract_field(text, text_lower, pattern, needle, lead)
+
+        for reg, pattern, needle, lead in regs:
+            val = _extract_field(text, text_lower, pattern, needle, lead)
+            if val:
+                trapframe[reg] = val
 
         return trapframe
 
+    @staticmethod
+    def parse_trapframe_lazy(text: str, arch: str = 'auto') -> LazyTrapframe:
+        """
+        Like parse_trapframe, but fields are only extracted when read.
+
+        For callers that look at a few fields of a dump; see LazyTrapframe.
+        """
+        is_ascii = text.isascii()
+        text_lower = text.lower() if is_ascii or arch == 'auto' else None
+        if arch == 'auto':
+            arch = _detect_arch(text_lower)
+        return LazyTrapframe(text, text_lower if is_ascii else None, arch)
+
     @staticmethod
     def decode_x86_page_fault_error_code(err_code: int) -> Dict[str, any]:
         """
@@ -134,20 +338,50 @@ class TrapframeParser:
         - R (bit 3): 0 = normal, 1 = reserved bit violation
         - I (bit 4): 0 = data access, 1 = instruction fetch
         """
-        return {
-            'present': bool(err_code & 0x1),
-            'write': bool(err_code & 0x2),
-            'user_mode': bool(err_code & 0x4),
-            'reserved': bool(err_code & 0x8),
-            'instruction_fetch': bool(err_code & 0x10),
-            'raw': err_code
+        result = dict(_PF_ERROR_TABLE[err_code & _PF_ERROR_MASK])
+        result['raw'] = err_code
+        return result
+
+    @staticmethod
+    def decode_x86_page_fault_error_codes(err_codes: Iterable[int]) -> List[Dict[str, any]]:
+        """
+        Decode a batch of x86 page fault error codes, e.g. from many trapframes.
+
+        Returns one decode_x86_page_fault_error_code() dict per entry, in input order.
+        """
+        decode = TrapframeParser.decode_x86_page_fault_error_code
+        return [decode(err_code) for err_code in err_codes]
+
+    @staticmethod
+    def decode_x86_page_fault_error_code_columns(err_codes: Iterable[int]) -> Dict[str, List]:
+        """
+        Decode a batch of x86 page fault error codes into columns.
+
+        Same fields as decode_x86_page_fault_error_code, but as one list per
+        field (index i belongs to err_codes[i]), for large log replays that
+        count or filter on a few bits across every record.
+        """
+        err_codes = list(err_codes)
+        # Mask each code once; every flag column is then a C-level map over
+        # its truth table
+        bits = [err_code & _PF_ERROR_MASK for err_code in err_codes]
+        columns: Dict[str, List] = {
+            name: list(map(table.__getitem__, bits)) for name, table in _PF_ERROR_COLUMNS
         }
+        columns['raw'] = err_codes
+        return columns
 
     @staticmethod
     def get_trap_description(trap_no: int, arch: str) -> str:
         """Get human-readable trap description."""
         if arch in ['x86_32', 'x86_64']:
-            return TrapframeParser.X86_TRAPS.get(trap_no, f'Unknown trap {trap_no}')
+            table = TrapframeParser._X86_TRAP_TABLE
+            if 0 <= trap_no < len(table) and table[trap_no] is not None:
+                return table[trap_no]
+            return f'Unknown trap {trap_no}'
         elif arch == 'riscv':
-            return TrapframeParser.RISCV_EXCEPTIONS.get(trap_no, f'Unknown exception {trap_no}')
+            table = TrapframeParser._RISCV_EXCEPTION_TABLE
+            if 0 <= trap_no < len(table) and table[trap_no] is not None:
+                return table[trap_no]
+            return f'Unknown exception {trap_no}'
         return f'Unknown trap {trap_no}'
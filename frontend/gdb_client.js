@@ -131,6 +131,14 @@ class GDBClient {
             }
         });
 
+        this.socket.on('memory_result', (data) => {
+            if (data.success) {
+                this.displayMemory(data.address, GDBClient.decodeMemory(data));
+            } else {
+                this.appendMessage('error', 'Failed to read memory');
+            }
+        });
+
         this.socket.on('breakpoint_result', (data) => {
             if (data.success) {
                 this.appendMessage('success', `Breakpoint ${data.number} set at ${data.location}`);
@@ -215,6 +223,14 @@ class GDBClient {
         this.socket.emit('gdb_get_registers');
     }
 
+    readMemory(address, size = 256, prefetch = false) {
+        this.socket.emit('gdb_read_memory', {
+            address: address,
+            size: size,
+            prefetch: prefetch
+        });
+    }
+
     setBreakpoint(location) {
         if (!location) {
             this.appendMessage('error', 'Breakpoint location not specified');
@@ -309,6 +325,48 @@ class GDBClient {
         this.appendHTML(html);
     }
 
+    /**
+     * Decode memory contents (base64) into a Uint8Array
+     */
+    static decodeMemory(data) {
+        const binary = atob(data.contents || '');
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return bytes;
+    }
+
+    /**
+     * Parse a hex address ("0x..." or bare hex) into a BigInt, 0n if invalid
+     */
+    static parseAddress(address) {
+        const match = /^\s*(?:0x)?([0-9a-f]+)/i.exec(String(address || ''));
+        return match ? BigInt('0x' + match[1]) : 0n;
+    }
+
+    displayMemory(address, bytes) {
+        if (!bytes || bytes.length === 0) {
+            return;
+        }
+
+        let html = '<div class="event-message event-info">';
+        html += '<div class="event-timestamp">' + new Date().toLocaleTimeString() + '</div>';
+        html += `<strong>Memory at ${address}:</strong>`;
+        html += '<div class="event-content"><pre>';
+
+        // 64-bit kernel addresses exceed Number's 2^53 precision, so use BigInt
+        const base = GDBClient.parseAddress(address);
+        for (let offset = 0; offset < bytes.length; offset += 16) {
+            const row = Array.from(bytes.subarray(offset, offset + 16),
+                b => b.toString(16).padStart(2, '0'));
+            html += `0x${(base + BigInt(offset)).toString(16).padStart(8, '0')}  ${row.join(' ')}\n`;
+        }
+
+        html += '</pre></div></div>';
+        this.appendHTML(html);
+    }
+
     appendCommandResult(data) {
         if (data.output) {
             this.appendMessage('info', data.output, true);
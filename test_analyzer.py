@@ -4,6 +4,9 @@ Simple test script for the OS Debugging Assistant backend.
 Tests the analyzers with example inputs.
 """
 
+import contextlib
+import functools
+import io
 import sys
 import os
 
@@ -13,6 +16,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 from analyzers.hypothesis_engine import HypothesisEngine
 
 
+@functools.lru_cache(maxsize=None)
+def _engine():
+    """The HypothesisEngine shared by all tests (built on first use)."""
+    return HypothesisEngine()
+
+
 def test_null_pointer_example():
     """Test with null pointer dereference example."""
     print("=" * 80)
@@ -34,7 +43,7 @@ a0             0x0
 s1             0x0
 """
 
-    engine = HypothesisEngine()
+    engine = _engine()
     result = engine.analyze(test_input)
 
     print(f"\nSummary: {result['summary']}")
@@ -67,7 +76,7 @@ VA 0x0000000080000000 -> PA 0x0000000080000000 | Flags: P W U
 VA 0x0000000080001000 -> PA 0x0000000080001000 | Flags: P W U
 """
 
-    engine = HypothesisEngine()
+    engine = _engine()
     result = engine.analyze(test_input)
 
     print(f"\nSummary: {result['summary']}")
@@ -101,7 +110,7 @@ eax 0 ebx 80112fd0
 cr2 0x8
 """
 
-    engine = HypothesisEngine()
+    engine = _engine()
     result = engine.analyze(test_input)
 
     print(f"\nSummary: {result['summary']}")
@@ -125,6 +134,40 @@ cr2 0x8
     return result
 
 
+def test_ai_routing():
+    """Test that the AI gates tell skipped, light-model and default-model cases apart."""
+    print("\n" + "=" * 80)
+    print("TEST 4: AI Call Routing")
+    print("=" * 80)
+
+    from analyzers.ai_agent import AIDebugAgent, _DEFAULT_MODELS, _LIGHT_MODELS
+
+    # No API calls are made; the provider only picks the model names.
+    # Silence the SDK availability notice, which depends on the environment
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = AIDebugAgent(provider='openai')
+
+    null_hypothesis = {'priority': 'high', 'scenario': 'Kernel Null Pointer Dereference'}
+    confirmed = {'hypotheses': [null_hypothesis],
+                 'all_findings': [{'category': 'panic'}, {'category': 'null_pointer'}]}
+    weakly_supported = {'hypotheses': [null_hypothesis],
+                        'all_findings': [{'category': 'panic'}]}
+    ambiguous = {'hypotheses': [null_hypothesis,
+                                {'priority': 'high', 'scenario': 'User Program Stack Overflow'}],
+                 'all_findings': [{'category': 'null_pointer'}]}
+
+    assert not agent._needs_llm(confirmed)
+    assert agent._needs_llm(weakly_supported)
+    assert agent._needs_llm(ambiguous)
+    assert agent._select_model(weakly_supported, 'short dump') == _LIGHT_MODELS['openai']
+    assert agent._select_model(weakly_supported, 'x' * 1000) == _DEFAULT_MODELS['openai']
+    assert agent._select_model(ambiguous, 'short dump') == _DEFAULT_MODELS['openai']
+
+    print("\nSkipped: confirmed single hypothesis")
+    print("Light model: single hypothesis without a specific finding, short output")
+    print("Default model: long output or competing hypotheses")
+
+
 def main():
     """Run all tests."""
     print("OS Debugging Assistant - Backend Test Suite")
@@ -134,6 +177,7 @@ def main():
         test_null_pointer_example()
         test_page_table_example()
         test_x86_page_fault()
+        test_ai_routing()
 
         print("\n" + "=" * 80)
         print("✓ All tests completed successfully!")
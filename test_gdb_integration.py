@@ -28,7 +28,7 @@ try:
     from flask_socketio import SocketIO
 
     test_app = Flask(__name__)
-    test_socketio = SocketIO(test_app, cors_allowed_origins="*", async_mode='eventlet')
+    test_socketio = SocketIO(test_app, cors_allowed_origins="*", async_mode='threading')
 
     print("   ✓ Flask-SocketIO initialized successfully")
 except Exception as e: